@@ -1,17 +1,61 @@
 
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from itertools import islice
+from multiprocessing import Pool
+from array import array
+from bisect import bisect_left, bisect_right
+
+CABECALHO_INDICE = struct.Struct("=8sHHQQIIIHQQ")   # Assinatura, versão, ordem dos bytes, n, amostras (runs na BWTRunLength),
+                                                    # passo_occ, passo_sa, símbolos,
+                                                    # tipo de índice, linha do texto (BWTGeneralizada e BWT empacotada)
+                                                    # e número de sequências (BWTGeneralizada).
+ASSINATURA_INDICE = b"BWTFMIDX"
+VERSAO_INDICE = 2
+TIPO_BWT = 0
+TIPO_GENERALIZADA = 1
+TIPO_EMPACOTADA = 2
+TIPO_RUN_LENGTH = 3
+
+CODIGOS_DNA = {"A": 0, "C": 1, "G": 2, "T": 3}      # Código de 2 bits de cada base na BWT empacotada.
+BITS_PARES = 0x5555555555555555                     # Bit menos significativo de cada base numa palavra de 64 bits.
+
+
 class BWT:
-    def __init__(self, seq="", constroi_array_sufixos=True):
+    def __init__(self, seq="", constroi_array_sufixos=None, passo_occ=32, passo_sa=None, empacotada=False):
         """
         Inicializa uma instância da classe BWT.
 
         Cria a transformação de Burrows-Wheeler (BWT) a partir da sequência fornecida e,
-        opcionalmente, constroi o array de sufixos.
+        opcionalmente, constroi o array de sufixos. Constrói também as tabelas do FM-index
+        (C e Occ) usadas na procura backward search.
 
         Args:
             seq (str, optional): Sequência de caracteres a processar. Por defeito, é uma string vazia.
-            constroi_array_sufixos (bool, optional): Se True, também constrói o array de sufixos. Por defeito é True.
+            constroi_array_sufixos (bool, optional): Se True, também constrói o array de sufixos. Por defeito é
+                True, exceto numa BWT empacotada, em que o array completo ocuparia muito mais do que a própria BWT.
+            passo_occ (int, optional): Intervalo de linhas entre contagens guardadas na tabela Occ. Por defeito é 32.
+            passo_sa (int, optional): Se indicado, guarda uma amostra do array de sufixos com as posições do texto
+                múltiplas de passo_sa, usada por localiza(). Por defeito é None (sem amostragem), ou 32 numa BWT
+                empacotada sem array de sufixos completo.
+            empacotada (bool, optional): Se True, guarda a BWT de uma sequência de DNA com 2 bits por base
+                (ver BWTEmpacotada). Por defeito é False.
         """
+        if constroi_array_sufixos is None:
+            constroi_array_sufixos = not empacotada
+        if empacotada and not constroi_array_sufixos and passo_sa is None:
+            passo_sa = 32                                                     # Amostra compacta para localiza().
+        self.passo_occ = passo_occ
+        self.passo_sa = passo_sa
+        self.sa_amostrado = None
+        self.indice_reverso = None
         self.bwt = self.constroi_bwt(seq, constroi_array_sufixos)            # Constroi a BWT e armazena no atributo self.bwt.
+        self.constroi_fm_index()
+        if empacotada:
+            self.bwt = BWTEmpacotada(self.bwt)                                # Substitui a string pela representação de 2 bits por base.
 
     def define_bwt(self, bw):
         """
@@ -21,13 +65,214 @@ class BWT:
             bw (str): String que representa a BWT a definir.
         """
         self.bwt = bw                                                        # Atualiza o atributo self.bwt com a nova string informada.
+        self.sa_amostrado = None                                             # A amostra do array de sufixos deixa de ser válida.
+        self.indice_reverso = None
+        self.constroi_fm_index()                                             # As tabelas do FM-index dependem da BWT.
+
+    def constroi_fm_index(self):
+        """
+        Constrói as tabelas do FM-index a partir da BWT.
+
+        A tabela C guarda, para cada caractere, o número de caracteres da BWT lexicograficamente
+        menores, ou seja, a linha onde o caractere começa na primeira coluna. A tabela Occ guarda,
+        para cada caractere, o número de ocorrências em self.bwt[:j * passo_occ], para cada j.
+        As contagens entre pontos de controlo são completadas em ocorrencias().
+        """
+        n = len(self.bwt)
+        self.c = {}                                                          # Tabela C: primeira linha de cada caractere na primeira coluna.
+        self.occ = {}                                                        # Tabela Occ: contagens acumuladas em cada ponto de controlo.
+        total = 0
+        for simbolo in sorted(set(self.bwt)):
+            self.c[simbolo] = total
+            contagens = array("I", [0])
+            acumulado = 0
+            for inicio in range(0, n, self.passo_occ):                       # Conta o caractere em cada bloco de passo_occ linhas.
+                acumulado += self.bwt.count(simbolo, inicio, inicio + self.passo_occ)
+                contagens.append(acumulado)
+            self.occ[simbolo] = contagens
+            total += acumulado
+
+    def ocorrencias(self, c, i):
+        """
+        Conta as ocorrências de um caractere nas primeiras i posições da BWT.
+
+        Parte da contagem guardada no ponto de controlo anterior a i e conta apenas as
+        ocorrências restantes, no máximo passo_occ posições.
+
+        Args:
+            c (str): Caractere a contar.
+            i (int): Número de posições iniciais da BWT a considerar.
+
+        Returns:
+            int: Número de ocorrências de c em self.bwt[:i].
+        """
+        contagens = self.occ.get(c)
+        if contagens is None:
+            return 0                                                         # Caractere ausente da BWT.
+        bloco = i // self.passo_occ
+        return contagens[bloco] + self.bwt.count(c, bloco * self.passo_occ, i)
+
+    def lf(self, i):
+        """
+        Aplica o mapeamento 'último para o primeiro' a uma linha da BWT.
+
+        Args:
+            i (int): Índice da linha na BWT.
+
+        Returns:
+            int: Linha da primeira coluna correspondente ao caractere self.bwt[i].
+        """
+        c = self.bwt[i]
+        return self.c[c] + self.ocorrencias(c, i)
+
+    def intervalo_bw(self, padrao):
+        """
+        Calcula o intervalo de linhas da BWT cujos prefixos correspondem ao padrão.
+
+        Executa a procura backward search com as tabelas C e Occ: cada caractere do padrão,
+        do último para o primeiro, custa duas consultas de ocorrências, independentemente
+        do tamanho do texto.
+
+        Args:
+            padrao (str): O padrão a ser procurado.
+
+        Returns:
+            tuple: Par (topo, fundo) com os limites, inclusivos, do intervalo. Se o padrão
+                não existir, topo é maior do que fundo.
+        """
+        topo = 0                                                             # Limite superior da procura.
+        fundo = len(self.bwt) - 1                                            # Limite inferior da procura.
+        for simbolo in reversed(padrao):
+            topo, fundo = self.estende_intervalo(simbolo, topo, fundo)
+            if topo > fundo:
+                return 0, -1                                                 # O padrão não ocorre no texto.
+        return topo, fundo
+
+    def estende_intervalo(self, c, topo, fundo):
+        """
+        Executa um passo da procura backward search.
+
+        Args:
+            c (str): Caractere a acrescentar à esquerda do padrão já procurado.
+            topo (int): Limite superior, inclusivo, do intervalo atual.
+            fundo (int): Limite inferior, inclusivo, do intervalo atual.
+
+        Returns:
+            tuple: Par (topo, fundo) das linhas que começam por c seguido do padrão já procurado.
+                Se não existir nenhuma, topo é maior do que fundo.
+        """
+        if c not in self.c:
+            return 0, -1                                                     # Um caractere ausente da BWT não pode ocorrer no texto.
+        return self.c[c] + self.ocorrencias(c, topo), self.c[c] + self.ocorrencias(c, fundo + 1) - 1
+
+    def limites_diferencas(self, padrao):
+        """
+        Calcula o limite inferior do número de diferenças de cada prefixo do padrão (array D do BWA).
+
+        Percorre o padrão da esquerda para a direita no índice do texto invertido, o que equivale
+        a procurar no texto original a subcadeia padrao[j:i + 1]. Sempre que essa subcadeia deixa
+        de ocorrer no texto, qualquer alinhamento de padrao[:i + 1] tem pelo menos mais uma
+        diferença e a procura recomeça em i + 1.
+
+        Args:
+            padrao (str): O padrão a analisar.
+
+        Returns:
+            list: Lista D em que D[i] é o mínimo de diferenças de padrao[:i + 1] em relação ao texto.
+        """
+        if self.indice_reverso is None:
+            texto = self.inversa_bwt()
+            self.indice_reverso = self.constroi_indice_reverso(texto[-2::-1] + texto[-1:])
+        reverso = self.indice_reverso
+        limites = []
+        diferencas = 0
+        topo, fundo = 0, len(reverso.bwt) - 1
+        for simbolo in padrao:
+            topo, fundo = reverso.estende_intervalo(simbolo, topo, fundo)
+            if topo > fundo:
+                diferencas += 1                                              # padrao[j:i + 1] não ocorre: recomeça a partir de i + 1.
+                topo, fundo = 0, len(reverso.bwt) - 1
+            limites.append(diferencas)
+        return limites
+
+    def constroi_indice_reverso(self, texto):
+        """
+        Constrói o índice do texto invertido usado por limites_diferencas().
+
+        Args:
+            texto (str): Texto invertido, terminado em '$'.
+
+        Returns:
+            BWT: Índice do texto invertido, sem array de sufixos.
+        """
+        return BWT(texto, constroi_array_sufixos=False, passo_occ=self.passo_occ)
+
+    def correspondencia_aproximada(self, padrao, max_diferencas):
+        """
+        Procura o padrão permitindo até max_diferencas substituições.
+
+        Estende a procura backward search por todos os símbolos do alfabeto em cada posição do
+        padrão, contando uma diferença sempre que o símbolo escolhido difere do padrão. Os ramos
+        em que as diferenças já usadas mais o limite inferior de limites_diferencas() para o
+        prefixo que falta ultrapassam max_diferencas são descartados.
+
+        Args:
+            padrao (str): O padrão a ser procurado.
+            max_diferencas (int): Número máximo de substituições permitidas.
+
+        Returns:
+            list: Lista ordenada de triplos (topo, fundo, diferencas), um por cada cadeia do texto
+                a até max_diferencas substituições do padrão.
+        """
+        limites = self.limites_diferencas(padrao)
+        alfabeto = [c for c in self.c if c != "$"]
+        resultado = []
+        pendentes = [(len(padrao) - 1, max_diferencas, 0, len(self.bwt) - 1)]  # (posição no padrão, diferenças restantes, topo, fundo).
+        while pendentes:
+            i, restantes, topo, fundo = pendentes.pop()
+            if i < 0:
+                resultado.append((topo, fundo, max_diferencas - restantes))
+                continue
+            if restantes < limites[i]:
+                continue                                                     # Não é possível alinhar padrao[:i + 1] com as diferenças restantes.
+            for simbolo in alfabeto:
+                novo_topo, novo_fundo = self.estende_intervalo(simbolo, topo, fundo)
+                if novo_topo > novo_fundo:
+                    continue
+                if simbolo == padrao[i]:
+                    pendentes.append((i - 1, restantes, novo_topo, novo_fundo))
+                elif restantes > 0:
+                    pendentes.append((i - 1, restantes - 1, novo_topo, novo_fundo))
+        resultado.sort()
+        return resultado
+
+    def correspondencia_aproximada_prefixo(self, padrao, max_diferencas):
+        """
+        Procura o padrão permitindo substituições e retorna as posições no texto original.
+
+        Args:
+            padrao (str): O padrão a ser procurado.
+            max_diferencas (int): Número máximo de substituições permitidas.
+
+        Returns:
+            list: Lista ordenada de pares (posicao, diferencas).
+        """
+        resultado = []
+        for topo, fundo, diferencas in self.correspondencia_aproximada(padrao, max_diferencas):
+            for m in range(topo, fundo + 1):
+                resultado.append((self.localiza(m), diferencas))
+        resultado.sort()
+        return resultado
 
     def constroi_bwt(self, texto, constroi_array_sufixos=False):
         """
         Constrói a BWT a partir do texto fornecido.
 
-        Gera todas as rotações do texto, ordena-as e constrói a BWT a partir do último
-        caractere de cada linha ordenada. Se solicitado, constrói também o array de sufixos.
+        Calcula o array de sufixos com o algoritmo SA-IS (tempo e memória lineares) e obtém
+        cada caractere da BWT diretamente a partir dele, como o caractere que precede o sufixo
+        correspondente, sem gerar as rotações do texto. Assume que o texto termina com um
+        sentinela único e lexicograficamente menor ('$'), caso em que a ordem dos sufixos
+        coincide com a ordem das rotações. Se solicitado, guarda também o array de sufixos.
 
         Args:
             texto (str): Texto de entrada.
@@ -36,38 +281,270 @@ class BWT:
         Returns:
             str: A BWT correspondente à sequência de entrada.
         """
-        lista = []                                           # Lista para armazenar todas as rotações do texto.
-        for i in range(len(texto)):
-            lista.append(texto[i:] + texto[:i])              # Para cada posição, cria uma rotação começando do caractere i.
-        lista.sort()                                         # Ordena lexicograficamente todas as rotações.
-        resultado = ""
-        for j in range(len(texto)):                          # Constrói a BWT recolhendo o último caractere de cada rotação ordenada.
-            resultado += lista[j][-1]
+        sa = self.calcula_array_sufixos(texto)                # Array de sufixos do texto (posições iniciais ordenadas).
+        resultado = "".join([texto[i - 1] for i in sa])      # O caractere anterior a cada sufixo (texto[-1] quando i = 0).
 
         if constroi_array_sufixos:
-            self.sa = []                                     # Array de sufixos a ser construído.
-            for i in range(len(lista)):
-                pos_inicial = lista[i].index("$")            # Localiza a posição do caractere especial '$' na rotação.
-                self.sa.append(len(texto) - pos_inicial - 1) # Calcula a posição real do sufixo no texto original.
+            self.sa = sa                                     # Guarda o array de sufixos já calculado.
+        if self.passo_sa:                                    # Guarda apenas uma amostra compacta do array de sufixos.
+            self.linhas_amostradas, self.linhas_sa, self.sa_amostrado = self.amostra_array_sufixos(sa, self.passo_sa)
         return resultado
 
+    def amostra_array_sufixos(self, sa, passo):
+        """
+        Calcula uma amostra compacta do array de sufixos.
+
+        São guardadas as entradas cuja posição no texto é múltipla de passo, em arrays de
+        inteiros de 32 bits, juntamente com um mapa de bits das linhas amostradas. Assim, a
+        partir de qualquer linha bastam no máximo passo - 1 passos LF para chegar a uma
+        linha amostrada. Aumentar passo reduz a memória e aumenta o custo de localiza().
+
+        Args:
+            sa (list): Array de sufixos completo.
+            passo (int): Intervalo entre as posições do texto amostradas.
+
+        Returns:
+            tuple: Mapa de bits das linhas amostradas, linhas amostradas por ordem crescente e
+                posição no texto de cada linha amostrada.
+        """
+        marcas = bytearray((len(sa) + 7) // 8)                        # Mapa de bits das linhas amostradas.
+        linhas = array("I")                                           # Linhas amostradas, por ordem crescente.
+        posicoes = array("I")                                         # Posição no texto de cada linha amostrada.
+        for linha, posicao in enumerate(sa):
+            if posicao % passo == 0:
+                marcas[linha >> 3] |= 1 << (linha & 7)
+                linhas.append(linha)
+                posicoes.append(posicao)
+        return marcas, linhas, posicoes
+
+    def calcula_array_sufixos(self, texto):
+        """
+        Calcula o array de sufixos do texto com o algoritmo SA-IS.
+
+        Converte os caracteres em inteiros pela sua ordem no alfabeto e delega a ordenação
+        dos sufixos na função sa_is.
+
+        Args:
+            texto (str): Texto de entrada.
+
+        Returns:
+            list: Lista com as posições iniciais dos sufixos do texto por ordem lexicográfica.
+        """
+        alfabeto = sorted(set(texto))                                      # Alfabeto ordenado do texto.
+        ordem = {c: i for i, c in enumerate(alfabeto)}                     # Código inteiro de cada caractere.
+        return sa_is([ordem[c] for c in texto], len(alfabeto) - 1)
+
+    def guarda(self, caminho, passo_sa=32):
+        """
+        Guarda a BWT e as tabelas do FM-index num ficheiro binário versionado.
+
+        O ficheiro contém um cabeçalho, o alfabeto, a tabela C, os pontos de controlo da
+        tabela Occ, a amostra do array de sufixos (se existir), o início de cada sequência
+        (numa BWTGeneralizada) e a BWT, com cada secção alinhada a 8 bytes para poder ser
+        mapeada diretamente em memória por carrega(). Os caracteres da BWT têm de ocupar
+        um byte (latin-1); uma BWT empacotada é guardada com as suas palavras de 2 bits por
+        base e a posição de '$' no cabeçalho.
+
+        Args:
+            caminho (str): Caminho do ficheiro a escrever.
+            passo_sa (int, optional): Passo da amostra a guardar quando só existe o array de
+                sufixos completo. Por defeito é 32.
+        """
+        simbolos = list(self.c)
+        amostras = None
+        if self.sa_amostrado is not None:
+            amostras = self.linhas_amostradas, self.linhas_sa, self.sa_amostrado
+            passo_sa = self.passo_sa
+        elif hasattr(self, "sa"):
+            amostras = self.amostra_array_sufixos(self.sa, passo_sa)           # Amostra o array de sufixos completo.
+        n_amostras = len(amostras[2]) if amostras else 0
+        generalizada = isinstance(self, BWTGeneralizada)
+        empacotada = isinstance(self.bwt, BWTEmpacotada)
+        inicios_seq = self.inicios_seq if generalizada else array("I")
+        if generalizada:
+            tipo, linha = TIPO_GENERALIZADA, self.linha_inicial
+        elif empacotada:
+            tipo, linha = TIPO_EMPACOTADA, self.bwt.sentinela
+        else:
+            tipo, linha = TIPO_BWT, 0
+        with open(caminho, "wb") as f:
+            def escreve(dados):
+                f.write(dados)
+                f.write(bytes(-len(dados) % 8))                                # Alinha a secção seguinte a 8 bytes.
+
+            escreve(CABECALHO_INDICE.pack(ASSINATURA_INDICE, VERSAO_INDICE, 1 if sys.byteorder == "little" else 2,
+                                          len(self.bwt), n_amostras, self.passo_occ, passo_sa if amostras else 0, len(simbolos),
+                                          tipo, linha, len(inicios_seq)))
+            escreve("".join(simbolos).encode("latin-1"))
+            escreve(array("I", [self.c[c] for c in simbolos]).tobytes())
+            escreve(b"".join(bytes(self.occ[c]) for c in simbolos))
+            for seccao in amostras or ():
+                escreve(bytes(seccao))
+            escreve(bytes(inicios_seq))
+            if empacotada:
+                escreve(bytes(self.bwt.palavras))
+            else:
+                escreve(self.bwt.encode("latin-1") if isinstance(self.bwt, str) else str(self.bwt).encode("latin-1"))
+
+    @classmethod
+    def carrega(cls, caminho):
+        """
+        Carrega um índice guardado com guarda(), mapeando o ficheiro em memória.
+
+        As tabelas e a BWT são vistas (memoryview) sobre o ficheiro mapeado, sem cópia: as
+        consultas podem começar de imediato, as páginas são lidas do disco apenas quando
+        acedidas e vários processos que carreguem o mesmo ficheiro partilham a mesma cache
+        de páginas do sistema operativo.
+
+        Args:
+            caminho (str): Caminho do ficheiro a carregar.
+
+        Returns:
+            BWT: Instância com a BWT e o FM-index carregados; uma BWTGeneralizada ou uma
+                BWTRunLength se o índice guardado o for.
+
+        Raises:
+            ValueError: Se o ficheiro não for um índice válido, tiver uma versão não suportada,
+                tiver sido escrito com outra ordem de bytes, for mais curto do que o cabeçalho
+                indica ou não for do tipo da classe quando carregado com BWTGeneralizada.carrega()
+                ou BWTRunLength.carrega().
+        """
+        with open(caminho, "rb") as f:
+            mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        erro = None
+        if len(mapa) < CABECALHO_INDICE.size or mapa[:len(ASSINATURA_INDICE)] != ASSINATURA_INDICE:
+            erro = f"'{caminho}' não é um índice BWT válido."
+        else:
+            (_, versao, ordem, n, n_amostras, passo_occ, passo_sa, n_simbolos,
+             tipo, linha_inicial, n_sequencias) = CABECALHO_INDICE.unpack_from(mapa)
+            if versao != VERSAO_INDICE:
+                erro = f"Versão {versao} do índice BWT não suportada."
+            elif ordem != (1 if sys.byteorder == "little" else 2):
+                erro = "O índice BWT foi escrito com outra ordem de bytes."
+            elif tipo != TIPO_GENERALIZADA and issubclass(cls, BWTGeneralizada):
+                erro = f"'{caminho}' não é um índice de uma BWTGeneralizada."
+            elif tipo != TIPO_RUN_LENGTH and issubclass(cls, BWTRunLength):
+                erro = f"'{caminho}' não é um índice de uma BWTRunLength."
+            elif tipo == TIPO_RUN_LENGTH:
+                if len(mapa) < _tamanho_indice_runs(n_amostras, n_simbolos):
+                    erro = f"'{caminho}' está truncado ou corrompido."
+            elif passo_occ == 0 or len(mapa) < _tamanho_indice(n, n_amostras, passo_occ, n_simbolos, n_sequencias,
+                                                                tipo == TIPO_EMPACOTADA):
+                erro = f"'{caminho}' está truncado ou corrompido."
+        if erro is not None:
+            mapa.close()
+            raise ValueError(erro)
+
+        vista = memoryview(mapa)
+        posicao = CABECALHO_INDICE.size + (-CABECALHO_INDICE.size % 8)
+
+        def le(tamanho, formato="B"):
+            nonlocal posicao
+            seccao = vista[posicao:posicao + tamanho]
+            posicao += tamanho + (-tamanho % 8)                                # Salta o alinhamento da secção.
+            return seccao.cast(formato) if formato != "B" else seccao
+
+        classes = {TIPO_GENERALIZADA: BWTGeneralizada, TIPO_RUN_LENGTH: BWTRunLength}
+        classe = classes.get(tipo, cls)
+        instancia = classe.__new__(classe)
+        instancia.passo_occ = passo_occ
+        instancia.passo_sa = passo_sa or None
+        simbolos = bytes(le(n_simbolos)).decode("latin-1")
+        tabela_c = le(4 * n_simbolos, "I")
+        instancia.c = {c: tabela_c[i] for i, c in enumerate(simbolos)}
+        instancia.sa_amostrado = None
+        instancia.indice_reverso = None
+        if tipo == TIPO_RUN_LENGTH:                                            # Runs, SA no fim de cada run e amostras de phi.
+            r = n_amostras
+            cabecas = bytes(le(r)).decode("latin-1")
+            instancia.bwt = SequenciaRunLength.de_runs(cabecas, le(4 * (r + 1), "I"))
+            instancia.sa_fim_run = le(4 * r, "I")
+            instancia.chaves_phi = le(4 * max(r - 1, 0), "I")
+            instancia.valores_phi = le(4 * max(r - 1, 0), "I")
+            return instancia
+        n_contagens = (n + passo_occ - 1) // passo_occ + 1
+        contagens = le(4 * n_contagens * n_simbolos, "I")
+        instancia.occ = {c: contagens[i * n_contagens:(i + 1) * n_contagens] for i, c in enumerate(simbolos)}
+        if n_amostras:
+            instancia.linhas_amostradas = le((n + 7) // 8)
+            instancia.linhas_sa = le(4 * n_amostras, "I")
+            instancia.sa_amostrado = le(4 * n_amostras, "I")
+        inicios_seq = le(4 * n_sequencias, "I")
+        if tipo == TIPO_GENERALIZADA:                                          # As linhas com '$' precisam da linha inicial em lf().
+            instancia.linha_inicial = linha_inicial
+            instancia.inicios_seq = inicios_seq
+        if tipo == TIPO_EMPACOTADA:
+            instancia.bwt = BWTEmpacotada.de_palavras(le(8 * ((n + 31) // 32), "Q"), n, linha_inicial)
+        else:
+            instancia.bwt = SequenciaMapeada(mapa, posicao, n)
+        return instancia
+
     def inversa_bwt(self):
         """
         Inverte a BWT para recuperar o texto original.
 
-        Reconstrói o texto original a partir da BWT, usando o método da tabela iterativa.
+        Reconstrói o texto original a partir da BWT, juntando os blocos produzidos por
+        inversa_bwt_blocos().
 
         Returns:
             str: O texto original se a inversão for bem-sucedida; caso contrário, retorna uma string vazia.
         """
-        n = len(self.bwt)                                                     # Número de linhas na tabela.
-        tabela = [""] * n                                                     # Inicializa a tabela com strings vazias.
+        return "".join(self.inversa_bwt_blocos())
+
+    def inversa_bwt_blocos(self, tamanho_bloco=65536):
+        """
+        Inverte a BWT, produzindo o texto original em blocos consecutivos.
+
+        Calcula, num único percurso da BWT, o inverso do mapeamento LF (para cada linha, a linha
+        da rotação que começa uma posição à frente) num array de inteiros. Partindo da linha cuja
+        rotação é o próprio texto (a que termina em '$'), percorre esse mapeamento e emite os
+        caracteres da primeira coluna pela ordem do texto. Executa em tempo O(n).
+
+        Args:
+            tamanho_bloco (int, optional): Número de caracteres de cada bloco. Por defeito é 65536.
+
+        Yields:
+            str: Blocos consecutivos do texto original. Não produz nada se a BWT não contiver '$'.
+        """
+        if "$" not in self.c:
+            return                                                            # Sem o caractere especial '$' não há texto a recuperar.
+        n = len(self.bwt)
+        primeira_coluna = "".join([c * self.ocorrencias(c, n) for c in self.c])  # Primeira coluna a partir das contagens totais.
+        seguinte = self.inverso_lf()
+        linha = self.linha_texto()                                            # Linha cuja rotação é o texto original.
+        bloco = []
         for _ in range(n):
-            tabela = sorted([self.bwt[i] + tabela[i] for i in range(n)])      # Em cada iteração, concatena o caractere da BWT à esquerda de cada linha da tabela.
-        for linha in tabela:                                                  # Cada iteração aproxima a tabela da reconstrução completa do texto original.
-            if linha.endswith("$"):                                           # Procura a linha que termina com o caractere especial '$'.
-                return linha
-        return ""                                                             # Retorna vazio se não encontrar o texto original.
+            bloco.append(primeira_coluna[linha])
+            linha = seguinte[linha]
+            if len(bloco) == tamanho_bloco:
+                yield "".join(bloco)
+                bloco = []
+        if bloco:
+            yield "".join(bloco)
+
+    def inverso_lf(self):
+        """
+        Calcula o inverso do mapeamento LF num único percurso da BWT.
+
+        Returns:
+            array: Array em que a posição LF(i) contém i, ou seja, para cada linha, a linha da
+                rotação que começa uma posição à frente.
+        """
+        proxima = dict(self.c)                                                # Próxima linha livre de cada caractere na primeira coluna.
+        seguinte = array("I", bytes(4 * len(self.bwt)))
+        for i, c in enumerate(self.bwt):
+            seguinte[proxima[c]] = i
+            proxima[c] += 1
+        return seguinte
+
+    def linha_texto(self):
+        """
+        Devolve a linha da BWT cuja rotação é o texto original, ou seja, a que termina em '$'.
+
+        Returns:
+            int: Índice da linha.
+        """
+        return self.bwt.index("$")
 
     def obtem_primeira_coluna(self):
         """
@@ -86,25 +563,23 @@ class BWT:
         Cria o mapeamento da última para a primeira coluna da BWT.
 
         Este método gera uma lista de índices correspondentes na primeira coluna (ordenada)
-        para cada posição na BWT.
+        para cada posição na BWT, percorrendo a BWT uma única vez a partir da tabela C.
 
         Returns:
             list: Lista com os índices correspondentes na primeira coluna para cada caractere da BWT.
         """
+        proxima = dict(self.c)                                                                         # Próxima linha livre de cada caractere na primeira coluna.
         resultado = []                                                                                 # Lista para armazenar os índices de mapeamento.
-        primeira_coluna = self.obtem_primeira_coluna()                                                 # Obtém a primeira coluna.
-        for i in range(len(primeira_coluna)):
-            c = self.bwt[i]                                                                            # Para cada índice na BWT, determina o caractere correspondente.
-            ocorrencias = self.bwt[:i].count(c) + 1                                                    # Conta quantas vezes o caractere aparece até à posição i.
-
-            resultado.append(self.encontra_iesima_ocorrencia(primeira_coluna, c, ocorrencias))         # Encontra a posição da ocorrência correspondente na primeira coluna.
+        for c in self.bwt:
+            resultado.append(proxima[c])                                                               # A k-ésima ocorrência de c na BWT corresponde à k-ésima na primeira coluna.
+            proxima[c] += 1
         return resultado
 
     def correspondencia_bw(self, padrao):
         """
         Realiza a procura backward search para encontrar o padrão na BWT.
 
-        Utiliza o mapeamento 'último para o primeiro' para efetuar a procura do padrão 
+        Utiliza as tabelas C e Occ do FM-index para efetuar a procura do padrão
         de forma eficiente na BWT.
 
         Args:
@@ -113,35 +588,37 @@ class BWT:
         Returns:
             list: Lista de índices da BWT onde o padrão é encontrado.
         """
-        lf = self.ultimo_para_primeiro()                                            # Obtém o mapeamento de última para a primeira coluna.
-        resultado = []                                                              # Lista para armazenar os índices onde o padrão é encontrado.
-        topo = 0                                                                    # Limite superior da procura.
-        fundo = len(self.bwt) - 1                                                   # Limite inferior da procura.
-        continuar = True                                                            # Flag de controlo do ciclo.
-        while continuar and topo <= fundo:
-            if padrao != "":
-                simbolo = padrao[-1]                                                # Seleciona o último caractere do padrão.
-                padrao = padrao[:-1]                                                # Remove o último caractere do padrão.
-                sublista = self.bwt[topo:(fundo + 1)]                               # Extrai a sublista da BWT entre os índices topo e fundo.
-                if simbolo in sublista:
-                    indice_topo = sublista.index(simbolo) + topo                    # Determina a nova posição superior para a procura.
-                    indice_fundo = fundo - sublista[::-1].index(simbolo)            # Determina a nova posição inferior para a procura.
-                    topo = lf[indice_topo]
-                    fundo = lf[indice_fundo]
-                else:
-                    continuar = False                                               # Se o símbolo não estiver na sublista, o padrão não existe.
-            else:
-                for i in range(topo, fundo + 1):                                    # Se o padrão estiver vazio, adiciona todos os índices do intervalo atual.
-                    resultado.append(i)
-                continuar = False
-        return resultado
+        topo, fundo = self.intervalo_bw(padrao)                                     # Intervalo de linhas que começam pelo padrão.
+        return list(range(topo, fundo + 1))
+
+    def localiza(self, linha):
+        """
+        Obtém a posição no texto do sufixo correspondente a uma linha da BWT.
+
+        Se existir uma amostra do array de sufixos, aplica o mapeamento LF até chegar a uma
+        linha amostrada e soma à posição guardada o número de passos dados. Caso contrário,
+        consulta o array de sufixos completo.
+
+        Args:
+            linha (int): Índice da linha na BWT.
+
+        Returns:
+            int: Posição no texto original onde começa o sufixo da linha.
+        """
+        if self.sa_amostrado is None:
+            return self.sa[linha]                                              # Sem amostragem, consulta o array de sufixos completo.
+        passos = 0
+        while not (self.linhas_amostradas[linha >> 3] >> (linha & 7)) & 1:
+            linha = self.lf(linha)                                             # Cada passo LF recua uma posição no texto.
+            passos += 1
+        return self.sa_amostrado[bisect_left(self.linhas_sa, linha)] + passos
 
     def correspondencia_bw_prefixo(self, padrao):
         """
         Realiza a correspondência backward search e retorna as posições relativas no texto original.
 
-        O método utiliza o array de sufixos (sa) para converter os índices da BWT nas posições
-        correspondentes do texto original.
+        O método utiliza o array de sufixos, completo ou amostrado, para converter os índices da
+        BWT nas posições correspondentes do texto original.
 
         Args:
             padrao (str): O padrão a ser procurado.
@@ -152,10 +629,68 @@ class BWT:
         resultado = []                                                 # Lista para armazenar as posições no texto original.
         correspondencias = self.correspondencia_bw(padrao)             # Índices da BWT que correspondem ao padrão.
         for m in correspondencias:
-            resultado.append(self.sa[m])                               # Converte cada índice da BWT para a posição correspondente no array de sufixos.
+            resultado.append(self.localiza(m))                         # Converte cada índice da BWT para a posição correspondente no texto.
         resultado.sort()                                               # Ordena as posições.
         return resultado
 
+    def procura(self, padrao):
+        """
+        Procura um padrão e devolve o intervalo da BWT e as posições no texto.
+
+        As posições só são calculadas se existir o array de sufixos, completo ou amostrado.
+
+        Args:
+            padrao (str): O padrão a ser procurado.
+
+        Returns:
+            tuple: Triplo (padrao, (topo, fundo), posicoes), com posicoes ordenadas ou None
+                se o índice não tiver array de sufixos.
+        """
+        topo, fundo = self.intervalo_bw(padrao)
+        posicoes = None
+        if self.sa_amostrado is not None or hasattr(self, "sa"):
+            posicoes = sorted(self.localiza(m) for m in range(topo, fundo + 1))
+        return padrao, (topo, fundo), posicoes
+
+    def procura_lote(self, padroes, processos=None, caminho_indice=None, tamanho_lote=1000):
+        """
+        Procura um conjunto de padrões, opcionalmente distribuindo-os por vários processos.
+
+        Os padrões podem vir de qualquer iterável, por exemplo le_sequencias() sobre um ficheiro
+        FASTA/FASTQ, e são consumidos em lotes de tamanho_lote. Com processos > 1, cada processo
+        carrega o índice com carrega(), pelo que todos partilham o mesmo ficheiro mapeado em
+        memória; se caminho_indice não for indicado, o índice é guardado num ficheiro temporário.
+
+        Args:
+            padroes (iterable): Padrões a procurar.
+            processos (int, optional): Número de processos a usar. Por defeito (None ou 1) a procura é feita no processo atual.
+            caminho_indice (str, optional): Ficheiro do índice, já escrito com guarda(), a carregar nos processos.
+            tamanho_lote (int, optional): Número de padrões enviados de cada vez a um processo. Por defeito é 1000.
+
+        Returns:
+            list: Resultados de procura() para cada padrão, pela ordem de entrada.
+        """
+        if not processos or processos <= 1:
+            return [self.procura(padrao) for padrao in padroes]
+
+        temporario = None
+        if caminho_indice is None:
+            descritor, temporario = tempfile.mkstemp(suffix=".idx")
+            os.close(descritor)
+            self.guarda(temporario)
+            caminho_indice = temporario
+        iterador = iter(padroes)
+        lotes = iter(lambda: list(islice(iterador, tamanho_lote)), [])     # Lotes consecutivos até esgotar os padrões.
+        try:
+            with Pool(processos, initializer=_inicia_processo, initargs=(caminho_indice,)) as pool:
+                resultado = []
+                for parcial in pool.imap(_procura_lote_processo, lotes):
+                    resultado.extend(parcial)
+                return resultado
+        finally:
+            if temporario is not None:
+                os.remove(temporario)
+
     def encontra_iesima_ocorrencia(self, lista, elemento, indice):
         """
         Encontra a i-ésima ocorrência de um elemento numa lista.
@@ -180,6 +715,847 @@ class BWT:
             j += 1                                                 # Avança para o próximo elemento na lista.
         return -1                                                  # Retorna -1 caso a ocorrência desejada não seja encontrada.
 
+_indice_processo = None                                 # Índice carregado em cada processo de procura_lote().
+
+
+def _alinhado(tamanho):
+    """
+    Tamanho de uma secção do ficheiro do índice, incluindo o alinhamento a 8 bytes.
+    """
+    return tamanho + (-tamanho % 8)
+
+
+def _tamanho_indice(n, n_amostras, passo_occ, n_simbolos, n_sequencias, empacotada=False):
+    """
+    Tamanho mínimo, em bytes, de um ficheiro escrito por BWT.guarda() com os valores do cabeçalho.
+    """
+    n_contagens = (n + passo_occ - 1) // passo_occ + 1
+    tamanho = (_alinhado(CABECALHO_INDICE.size) + _alinhado(n_simbolos) + _alinhado(4 * n_simbolos)
+               + _alinhado(4 * n_contagens * n_simbolos) + _alinhado(4 * n_sequencias)
+               + (8 * ((n + 31) // 32) if empacotada else n))
+    if n_amostras:
+        tamanho += _alinhado((n + 7) // 8) + 2 * _alinhado(4 * n_amostras)
+    return tamanho
+
+
+def _tamanho_indice_runs(r, n_simbolos):
+    """
+    Tamanho mínimo, em bytes, de um ficheiro escrito por BWTRunLength.guarda() com r runs.
+    """
+    n_phi = max(r - 1, 0)
+    return (_alinhado(CABECALHO_INDICE.size) + _alinhado(n_simbolos) + _alinhado(4 * n_simbolos) + _alinhado(r)
+            + _alinhado(4 * (r + 1)) + _alinhado(4 * r) + _alinhado(4 * n_phi) + 4 * n_phi)
+
+
+def _inicia_processo(caminho_indice):
+    """
+    Carrega, num processo de procura_lote(), o índice mapeado em memória.
+
+    Args:
+        caminho_indice (str): Ficheiro do índice escrito com BWT.guarda().
+    """
+    global _indice_processo
+    _indice_processo = BWT.carrega(caminho_indice)
+
+
+def _procura_lote_processo(padroes):
+    """
+    Procura um lote de padrões no índice do processo.
+
+    Args:
+        padroes (list): Padrões a procurar.
+
+    Returns:
+        list: Resultados de BWT.procura() para cada padrão.
+    """
+    return [_indice_processo.procura(padrao) for padrao in padroes]
+
+
+def le_sequencias(linhas):
+    """
+    Lê as sequências de um ficheiro FASTA ou FASTQ, uma de cada vez.
+
+    O formato é detetado pelo primeiro caractere do primeiro registo ('>' para FASTA e '@'
+    para FASTQ). Em FASTA, as sequências podem ocupar várias linhas.
+
+    Args:
+        linhas (iterable): Ficheiro aberto ou outro iterável de linhas.
+
+    Yields:
+        str: Sequência de cada registo.
+    """
+    linhas = (linha.strip() for linha in linhas)
+    linhas = (linha for linha in linhas if linha)
+    primeira = next(linhas, None)
+    if primeira is None:
+        return
+    if primeira.startswith("@"):
+        while primeira is not None:                         # Registos FASTQ: cabeçalho, sequência, '+' e qualidades.
+            sequencia = next(linhas, "")
+            next(linhas, None)
+            next(linhas, None)
+            yield sequencia
+            primeira = next(linhas, None)
+    else:
+        partes = []
+        for linha in linhas:
+            if linha.startswith(">"):
+                yield "".join(partes)
+                partes = []
+            else:
+                partes.append(linha)
+        yield "".join(partes)
+
+
+class BWTRunLength(BWT):
+    """
+    BWT comprimida por run-length, com memória proporcional ao número de runs (r-index).
+
+    Guarda apenas o caractere e a linha inicial de cada run da BWT e, para localizar as
+    ocorrências, o valor do array de sufixos no fim de cada run e a função phi (de SA[i]
+    para SA[i - 1]) amostrada no início de cada run. Em coleções de sequências quase
+    idênticas o número de runs r é muito menor do que o tamanho do texto n.
+    """
+
+    def __init__(self, seq=""):
+        """
+        Inicializa uma instância da classe BWTRunLength.
+
+        O array de sufixos completo só existe durante a construção.
+
+        Args:
+            seq (str, optional): Sequência de caracteres a processar, terminada em '$'. Por defeito, é uma string vazia.
+        """
+        self.passo_occ = 32
+        self.passo_sa = None
+        self.sa_amostrado = None
+        self.indice_reverso = None
+        sa = self.calcula_array_sufixos(seq)
+        self.bwt = SequenciaRunLength(seq[i - 1] for i in sa)
+        self.c = {}
+        total = 0
+        for c in sorted(self.bwt.acumulado):
+            self.c[c] = total
+            total += self.bwt.acumulado[c][-1]
+
+        inicios = self.bwt.inicios
+        self.sa_fim_run = array("I", [sa[inicios[j + 1] - 1] for j in range(len(inicios) - 1)])  # SA na última linha de cada run.
+        amostras_phi = sorted((sa[inicios[j]], self.sa_fim_run[j - 1]) for j in range(1, len(inicios) - 1))
+        self.chaves_phi = array("I", [chave for chave, _ in amostras_phi])      # SA na primeira linha de cada run, ordenado.
+        self.valores_phi = array("I", [valor for _, valor in amostras_phi])     # SA na linha anterior a essa.
+
+    def define_bwt(self, bw):
+        """
+        Define manualmente a BWT.
+
+        As posições no texto no fim de cada run e as amostras de phi dependem do array de
+        sufixos, pelo que o texto é recuperado invertendo a BWT e o índice é reconstruído.
+
+        Args:
+            bw (str): String que representa a BWT a definir.
+
+        Raises:
+            ValueError: Se a BWT não contiver o caractere '$'.
+        """
+        auxiliar = BWT(constroi_array_sufixos=False)
+        auxiliar.define_bwt(bw)
+        texto = auxiliar.inversa_bwt()
+        if len(texto) != len(bw):
+            raise ValueError("A BWT tem de conter o caractere '$'.")
+        self.__init__(texto)
+
+    def ocorrencias(self, c, i):
+        """
+        Conta as ocorrências de um caractere nas primeiras i posições da BWT, sobre as runs.
+
+        Args:
+            c (str): Caractere a contar.
+            i (int): Número de posições iniciais da BWT a considerar.
+
+        Returns:
+            int: Número de ocorrências de c em self.bwt[:i].
+        """
+        return self.bwt.ocorrencias(c, i)
+
+    def phi(self, posicao):
+        """
+        Dada a posição SA[i] de uma linha i > 0, devolve SA[i - 1].
+
+        Usa a amostra do início de run com a maior posição no texto que não excede a pedida.
+
+        Args:
+            posicao (int): Valor SA[i] de uma linha que não é a primeira.
+
+        Returns:
+            int: Valor SA[i - 1].
+        """
+        k = bisect_right(self.chaves_phi, posicao) - 1
+        return self.valores_phi[k] + posicao - self.chaves_phi[k]
+
+    def intervalo_com_posicao(self, padrao):
+        """
+        Procura o padrão mantendo a posição no texto da última linha do intervalo.
+
+        Em cada passo da procura backward search, se a última linha do intervalo não tiver o
+        caractere pretendido, a última linha que o tem é o fim de uma run, cuja posição está
+        guardada em sa_fim_run.
+
+        Args:
+            padrao (str): O padrão a ser procurado.
+
+        Returns:
+            tuple: Triplo (topo, fundo, posicao) com posicao = SA[fundo]. Se o padrão não existir,
+                topo é maior do que fundo.
+        """
+        topo, fundo = 0, len(self.bwt) - 1
+        if fundo < 0:
+            return 0, -1, 0
+        posicao = self.sa_fim_run[-1]
+        for simbolo in reversed(padrao):
+            novo_topo, novo_fundo = self.estende_intervalo(simbolo, topo, fundo)
+            if novo_topo > novo_fundo:
+                return 0, -1, 0
+            posicao = self.posicao_estendida(simbolo, fundo, posicao)
+            topo, fundo = novo_topo, novo_fundo
+        return topo, fundo, posicao
+
+    def posicao_estendida(self, simbolo, fundo, posicao):
+        """
+        Atualiza a posição da última linha de um intervalo quando este é estendido por um símbolo.
+
+        Args:
+            simbolo (str): Símbolo acrescentado à esquerda; tem de ocorrer no intervalo.
+            fundo (int): Última linha do intervalo antes da extensão.
+            posicao (int): Valor SA[fundo].
+
+        Returns:
+            int: Valor SA na última linha do intervalo estendido.
+        """
+        run = self.bwt.run(fundo)
+        if self.bwt.cabecas[run] != simbolo:                                 # Última ocorrência do símbolo: fim de uma run anterior.
+            runs = self.bwt.runs[simbolo]
+            posicao = self.sa_fim_run[runs[bisect_left(runs, run) - 1]]
+        return (posicao - 1) % len(self.bwt)
+
+    def posicoes_intervalo(self, topo, fundo, posicao):
+        """
+        Obtém, com phi, as posições no texto de todas as linhas de um intervalo.
+
+        Args:
+            topo (int): Primeira linha do intervalo.
+            fundo (int): Última linha do intervalo.
+            posicao (int): Valor SA[fundo].
+
+        Returns:
+            list: Lista ordenada com as posições no texto.
+        """
+        resultado = []
+        if topo <= fundo:
+            resultado.append(posicao)
+            for _ in range(fundo - topo):
+                posicao = self.phi(posicao)
+                resultado.append(posicao)
+        resultado.sort()
+        return resultado
+
+    def localiza(self, linha):
+        """
+        Obtém a posição no texto correspondente a uma linha da BWT.
+
+        Parte da posição guardada para o fim da run que contém a linha e aplica phi até chegar
+        à linha pedida, num número de passos limitado pelo comprimento da run. Para localizar
+        todas as linhas de um intervalo, correspondencia_bw_prefixo() é mais eficiente.
+
+        Args:
+            linha (int): Índice da linha na BWT.
+
+        Returns:
+            int: Posição no texto original.
+        """
+        run = self.bwt.run(linha)
+        posicao = self.sa_fim_run[run]
+        for _ in range(self.bwt.inicios[run + 1] - 1 - linha):
+            posicao = self.phi(posicao)
+        return posicao
+
+    def correspondencia_bw_prefixo(self, padrao):
+        """
+        Procura o padrão e retorna as posições correspondentes no texto original.
+
+        Obtém a posição da última linha do intervalo e aplica phi para obter as restantes.
+
+        Args:
+            padrao (str): O padrão a ser procurado.
+
+        Returns:
+            list: Lista ordenada com as posições correspondentes no texto original.
+        """
+        return self.posicoes_intervalo(*self.intervalo_com_posicao(padrao))
+
+    def correspondencia_aproximada_prefixo(self, padrao, max_diferencas):
+        """
+        Procura o padrão permitindo substituições e retorna as posições no texto original.
+
+        Segue a mesma procura de correspondencia_aproximada(), mantendo em cada ramo a posição
+        da última linha do intervalo, como intervalo_com_posicao(); as restantes posições de
+        cada intervalo são obtidas com phi.
+
+        Args:
+            padrao (str): O padrão a ser procurado.
+            max_diferencas (int): Número máximo de substituições permitidas.
+
+        Returns:
+            list: Lista ordenada de pares (posicao, diferencas).
+        """
+        if len(self.bwt) == 0:
+            return []
+        limites = self.limites_diferencas(padrao)
+        alfabeto = [c for c in self.c if c != "$"]
+        resultado = []
+        pendentes = [(len(padrao) - 1, max_diferencas, 0, len(self.bwt) - 1, self.sa_fim_run[-1])]
+        while pendentes:
+            i, restantes, topo, fundo, posicao = pendentes.pop()
+            if i < 0:
+                diferencas = max_diferencas - restantes
+                resultado.extend((p, diferencas) for p in self.posicoes_intervalo(topo, fundo, posicao))
+                continue
+            if restantes < limites[i]:
+                continue                                                     # Não é possível alinhar padrao[:i + 1] com as diferenças restantes.
+            for simbolo in alfabeto:
+                novo_topo, novo_fundo = self.estende_intervalo(simbolo, topo, fundo)
+                if novo_topo > novo_fundo:
+                    continue
+                if simbolo != padrao[i] and restantes == 0:
+                    continue
+                nova_posicao = self.posicao_estendida(simbolo, fundo, posicao)
+                pendentes.append((i - 1, restantes - (simbolo != padrao[i]), novo_topo, novo_fundo, nova_posicao))
+        resultado.sort()
+        return resultado
+
+    def procura(self, padrao):
+        """
+        Procura um padrão e devolve o intervalo da BWT e as posições no texto.
+
+        Args:
+            padrao (str): O padrão a ser procurado.
+
+        Returns:
+            tuple: Triplo (padrao, (topo, fundo), posicoes), com posicoes ordenadas.
+        """
+        topo, fundo = self.intervalo_bw(padrao)
+        return padrao, (topo, fundo), self.correspondencia_bw_prefixo(padrao)
+
+    def constroi_indice_reverso(self, texto):
+        """
+        Constrói o índice do texto invertido usado por limites_diferencas(), também por runs.
+
+        Args:
+            texto (str): Texto invertido, terminado em '$'.
+
+        Returns:
+            BWTRunLength: Índice do texto invertido.
+        """
+        return BWTRunLength(texto)
+
+    def guarda(self, caminho, passo_sa=32):
+        """
+        Guarda o índice num ficheiro binário versionado, com o mesmo cabeçalho de BWT.guarda().
+
+        Em vez das tabelas Occ e da BWT, o ficheiro contém o caractere e a linha inicial de cada
+        run, a posição no texto no fim de cada run e as amostras de phi, com tamanho O(r).
+        carrega() mapeia estas secções em memória e reconstrói apenas os índices das runs de
+        cada caractere.
+
+        Args:
+            caminho (str): Caminho do ficheiro a escrever.
+            passo_sa (int, optional): Ignorado; existe para manter a assinatura de BWT.guarda().
+        """
+        simbolos = list(self.c)
+        with open(caminho, "wb") as f:
+            def escreve(dados):
+                f.write(dados)
+                f.write(bytes(-len(dados) % 8))                                # Alinha a secção seguinte a 8 bytes.
+
+            escreve(CABECALHO_INDICE.pack(ASSINATURA_INDICE, VERSAO_INDICE, 1 if sys.byteorder == "little" else 2,
+                                          len(self.bwt), len(self.bwt.cabecas), self.passo_occ, 0, len(simbolos),
+                                          TIPO_RUN_LENGTH, 0, 0))
+            escreve("".join(simbolos).encode("latin-1"))
+            escreve(array("I", [self.c[c] for c in simbolos]).tobytes())
+            escreve(self.bwt.cabecas.encode("latin-1"))
+            for seccao in (self.bwt.inicios, self.sa_fim_run, self.chaves_phi, self.valores_phi):
+                escreve(bytes(seccao))
+
+
+class SequenciaRunLength:
+    """
+    BWT codificada por runs, com as operações de string usadas pela classe BWT.
+
+    Para cada run guarda o caractere e a linha inicial e, para cada caractere, os índices
+    das suas runs e o comprimento acumulado dessas runs, o que permite contar ocorrências
+    com duas procuras binárias.
+    """
+
+    def __init__(self, caracteres):
+        """
+        Codifica a BWT em runs.
+
+        Args:
+            caracteres (iterable): Caracteres da BWT, por ordem.
+        """
+        cabecas = []
+        self.inicios = array("I")                                             # Linha inicial de cada run, seguida de n.
+        self.runs = {}                                                        # Índices das runs de cada caractere.
+        self.acumulado = {}                                                   # Comprimento acumulado das runs de cada caractere.
+        n = 0
+        for c in caracteres:
+            if not cabecas or cabecas[-1] != c:
+                if cabecas:
+                    self.acumulado[cabecas[-1]].append(self.acumulado[cabecas[-1]][-1] + n - self.inicios[-1])
+                self.runs.setdefault(c, array("I")).append(len(cabecas))
+                self.acumulado.setdefault(c, array("I", [0]))
+                cabecas.append(c)
+                self.inicios.append(n)
+            n += 1
+        if cabecas:
+            self.acumulado[cabecas[-1]].append(self.acumulado[cabecas[-1]][-1] + n - self.inicios[-1])
+        self.inicios.append(n)
+        self.cabecas = "".join(cabecas)
+
+    @classmethod
+    def de_runs(cls, cabecas, inicios):
+        """
+        Cria a codificação a partir do caractere e da linha inicial de cada run, em tempo O(r).
+
+        Args:
+            cabecas (str): Caractere de cada run.
+            inicios (sequence): Linha inicial de cada run, seguida de n.
+
+        Returns:
+            SequenciaRunLength: Codificação com inicios partilhado, sem cópia.
+        """
+        instancia = cls.__new__(cls)
+        instancia.cabecas = cabecas
+        instancia.inicios = inicios
+        instancia.runs = {}
+        instancia.acumulado = {}
+        for j, c in enumerate(cabecas):
+            instancia.runs.setdefault(c, array("I")).append(j)
+            acumulado = instancia.acumulado.setdefault(c, array("I", [0]))
+            acumulado.append(acumulado[-1] + inicios[j + 1] - inicios[j])
+        return instancia
+
+    def __len__(self):
+        return self.inicios[-1]
+
+    def run(self, i):
+        """
+        Devolve o índice da run que contém a linha i.
+        """
+        return bisect_right(self.inicios, i) - 1
+
+    def ocorrencias(self, c, i):
+        """
+        Conta as ocorrências de c nas primeiras i posições.
+        """
+        runs = self.runs.get(c)
+        if runs is None or i <= 0:
+            return 0
+        run = self.run(i - 1)
+        k = bisect_left(runs, run)                                            # Runs de c anteriores à run da posição i - 1.
+        total = self.acumulado[c][k]
+        if self.cabecas[run] == c:
+            total += i - self.inicios[run]
+        return total
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return "".join([self[j] for j in range(*i.indices(len(self)))])
+        if i < 0:
+            i += len(self)
+        return self.cabecas[self.run(i)]
+
+    def __iter__(self):
+        for j, c in enumerate(self.cabecas):
+            for _ in range(self.inicios[j + 1] - self.inicios[j]):
+                yield c
+
+    def __str__(self):
+        return "".join(self)
+
+    def count(self, c, inicio=0, fim=None):
+        fim = len(self) if fim is None else min(fim, len(self))
+        return max(0, self.ocorrencias(c, fim) - self.ocorrencias(c, inicio))
+
+    def index(self, c):
+        if c not in self.runs:
+            raise ValueError(f"'{c}' não ocorre na BWT.")
+        return self.inicios[self.runs[c][0]]
+
+
+class BWTGeneralizada(BWT):
+    """
+    BWT de um conjunto de sequências, cada uma terminada pelo seu próprio '$'.
+
+    As sequências são concatenadas e o início de cada uma é guardado num array ordenado,
+    pelo que as posições encontradas são convertidas em pares (sequência, posição) com
+    uma procura binária. Os padrões procurados não devem conter '$'.
+    """
+
+    def __init__(self, sequencias, passo_occ=32, passo_sa=None):
+        """
+        Inicializa uma instância da classe BWTGeneralizada.
+
+        Args:
+            sequencias (iterable): Sequências a indexar, com ou sem '$' final.
+            passo_occ (int, optional): Intervalo de linhas entre contagens guardadas na tabela Occ. Por defeito é 32.
+            passo_sa (int, optional): Se indicado, guarda apenas uma amostra do array de sufixos com este passo,
+                em vez do array completo. Por defeito é None.
+        """
+        self.passo_occ = passo_occ
+        self.passo_sa = passo_sa
+        self.sa_amostrado = None
+        self.indice_reverso = None
+        self.inicios_seq = array("I")                                         # Posição inicial de cada sequência no texto.
+        partes = []
+        posicao = 0
+        for sequencia in sequencias:
+            sequencia = sequencia.rstrip("$")
+            self.inicios_seq.append(posicao)
+            partes.append(sequencia + "$")
+            posicao += len(sequencia) + 1
+        texto = "".join(partes)
+
+        sa = self.calcula_array_sufixos(texto)
+        self.bwt = "".join([texto[i - 1] for i in sa])
+        self.linha_inicial = sa.index(0) if sa else 0                         # Linha do sufixo que começa na posição 0.
+        if passo_sa:
+            self.linhas_amostradas, self.linhas_sa, self.sa_amostrado = self.amostra_array_sufixos(sa, passo_sa)
+        else:
+            self.sa = sa
+        self.constroi_fm_index()
+
+    def define_bwt(self, bw):
+        """
+        Não suportado: o índice é construído a partir das sequências.
+
+        Raises:
+            NotImplementedError: Sempre.
+        """
+        raise NotImplementedError("A BWTGeneralizada é construída a partir das sequências.")
+
+    def lf(self, i):
+        """
+        Aplica o mapeamento 'último para o primeiro' a uma linha da BWT.
+
+        Com vários '$', a linha do sufixo que começa na posição 0 corresponde ao último '$' do
+        texto, o menor dos sufixos que começam por '$', e por isso ocupa a primeira linha de '$'
+        na primeira coluna; as restantes linhas com '$' seguem-se por ordem.
+
+        Args:
+            i (int): Índice da linha na BWT.
+
+        Returns:
+            int: Linha da primeira coluna correspondente ao caractere self.bwt[i].
+        """
+        if self.bwt[i] != "$":
+            return super().lf(i)
+        if i == self.linha_inicial:
+            return self.c["$"]
+        return self.c["$"] + self.ocorrencias("$", i) + (1 if i < self.linha_inicial else 0)
+
+    def inverso_lf(self):
+        """
+        Calcula o inverso do mapeamento LF, corrigindo a ordem das linhas com '$' como em lf().
+
+        Returns:
+            array: Array em que a posição LF(i) contém i.
+        """
+        seguinte = super().inverso_lf()
+        if "$" in self.c:
+            linha = self.c["$"]
+            seguinte[linha] = self.linha_inicial
+            for i, c in enumerate(self.bwt):
+                if c == "$" and i != self.linha_inicial:
+                    linha += 1
+                    seguinte[linha] = i
+        return seguinte
+
+    def linha_texto(self):
+        """
+        Devolve a linha da BWT cuja rotação é o texto concatenado.
+
+        Returns:
+            int: Índice da linha.
+        """
+        return self.linha_inicial
+
+    def localiza_sequencia(self, posicao):
+        """
+        Converte uma posição do texto concatenado num par (sequência, posição na sequência).
+
+        Args:
+            posicao (int): Posição no texto concatenado.
+
+        Returns:
+            tuple: Par (índice da sequência, posição dentro da sequência).
+        """
+        sequencia = bisect_right(self.inicios_seq, posicao) - 1
+        return sequencia, posicao - self.inicios_seq[sequencia]
+
+    def correspondencia_sequencias(self, padrao):
+        """
+        Procura o padrão em todas as sequências.
+
+        Args:
+            padrao (str): O padrão a ser procurado.
+
+        Returns:
+            list: Lista ordenada de pares (índice da sequência, posição na sequência).
+        """
+        return [self.localiza_sequencia(posicao) for posicao in self.correspondencia_bw_prefixo(padrao)]
+
+
+class SequenciaMapeada:
+    """
+    Vista só de leitura sobre uma BWT guardada num ficheiro mapeado em memória.
+
+    Disponibiliza as operações de string usadas pela classe BWT (tamanho, acesso por índice,
+    contagem e procura de caracteres), lendo diretamente os bytes (latin-1) do ficheiro.
+    """
+
+    def __init__(self, mapa, inicio, tamanho):
+        """
+        Inicializa a vista sobre os bytes da BWT.
+
+        Args:
+            mapa (mmap.mmap): Ficheiro mapeado em memória, mantido aberto enquanto a vista existir.
+            inicio (int): Posição do primeiro byte da BWT no ficheiro.
+            tamanho (int): Número de caracteres da BWT.
+        """
+        self.mapa = mapa
+        self.inicio = inicio
+        self.dados = memoryview(mapa)[inicio:inicio + tamanho]
+
+    def __len__(self):
+        return len(self.dados)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return bytes(self.dados[i]).decode("latin-1")
+        return chr(self.dados[i])
+
+    def __iter__(self):
+        for inicio in range(0, len(self.dados), 65536):                     # Descodifica a BWT por blocos.
+            yield from bytes(self.dados[inicio:inicio + 65536]).decode("latin-1")
+
+    def __str__(self):
+        return self[:]
+
+    def count(self, c, inicio=0, fim=None):
+        return bytes(self.dados[inicio:fim]).count(c.encode("latin-1"))
+
+    def index(self, c):
+        posicao = self.mapa.find(c.encode("latin-1"), self.inicio, self.inicio + len(self.dados))
+        if posicao < 0:
+            raise ValueError(f"'{c}' não ocorre na BWT.")
+        return posicao - self.inicio
+
+
+class BWTEmpacotada:
+    """
+    Representação compacta da BWT de uma sequência de DNA, com 2 bits por base.
+
+    As bases A, C, G e T são guardadas em palavras de 64 bits (32 bases por palavra) e a
+    posição do caractere especial '$' é guardada à parte. Disponibiliza as mesmas operações
+    de string que a classe BWT usa sobre self.bwt; as contagens são feitas diretamente
+    sobre as palavras, com contagem de bits (popcount).
+    """
+
+    def __init__(self, bwt):
+        """
+        Empacota a BWT fornecida.
+
+        Args:
+            bwt (str): BWT com as bases A, C, G, T e um único '$'.
+
+        Raises:
+            ValueError: Se a BWT tiver outros caracteres ou não tiver exatamente um '$'.
+        """
+        if bwt.count("$") != 1 or not set(bwt) <= set(CODIGOS_DNA) | {"$"}:
+            raise ValueError("A BWT empacotada exige uma sequência de DNA (A, C, G, T) com um único '$'.")
+        self.n = len(bwt)
+        self.sentinela = bwt.index("$")                                       # Posição de '$', guardado como 'A' nas palavras.
+        self.palavras = array("Q", bytes(8 * ((self.n + 31) // 32)))
+        for k in range(len(self.palavras)):
+            palavra = 0
+            for j, c in enumerate(bwt[32 * k:32 * k + 32]):
+                palavra |= CODIGOS_DNA.get(c, 0) << (2 * j)
+            self.palavras[k] = palavra
+
+    @classmethod
+    def de_palavras(cls, palavras, n, sentinela):
+        """
+        Cria a representação a partir de palavras já empacotadas (por exemplo, mapeadas de um ficheiro).
+
+        Args:
+            palavras (sequence): Palavras de 64 bits com 32 bases cada.
+            n (int): Número de caracteres da BWT.
+            sentinela (int): Posição de '$'.
+
+        Returns:
+            BWTEmpacotada: Vista sobre as palavras, sem cópia.
+        """
+        instancia = cls.__new__(cls)
+        instancia.n = n
+        instancia.sentinela = sentinela
+        instancia.palavras = palavras
+        return instancia
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return "".join([self[j] for j in range(*i.indices(self.n))])
+        if i < 0:
+            i += self.n
+        if i == self.sentinela:
+            return "$"
+        return "ACGT"[(self.palavras[i >> 5] >> (2 * (i & 31))) & 3]
+
+    def __iter__(self):
+        for i in range(self.n):
+            yield self[i]
+
+    def __str__(self):
+        return self[:]
+
+    def count(self, c, inicio=0, fim=None):
+        fim = self.n if fim is None else min(fim, self.n)
+        if inicio >= fim:
+            return 0
+        if c == "$":
+            return 1 if inicio <= self.sentinela < fim else 0
+        codigo = CODIGOS_DNA.get(c)
+        if codigo is None:
+            return 0
+        repetido = codigo * BITS_PARES                                        # O código da base repetido em todas as posições da palavra.
+        total = 0
+        for k in range(inicio >> 5, ((fim - 1) >> 5) + 1):
+            base = k << 5
+            baixo = max(inicio, base) - base
+            alto = min(fim, base + 32) - base
+            x = self.palavras[k] ^ repetido                                   # Posições iguais à base ficam a 00.
+            diferentes = (x | (x >> 1)) & BITS_PARES & (((1 << (2 * alto)) - 1) ^ ((1 << (2 * baixo)) - 1))
+            total += alto - baixo - diferentes.bit_count()
+        if c == "A" and inicio <= self.sentinela < fim:
+            total -= 1                                                        # O '$' foi guardado como 'A'.
+        return total
+
+    def index(self, c):
+        if c == "$":
+            return self.sentinela
+        for i in range(self.n):
+            if self[i] == c:
+                return i
+        raise ValueError(f"'{c}' não ocorre na BWT.")
+
+
+def sa_is(seq, maior_simbolo):
+    """
+    Calcula o array de sufixos de uma sequência de inteiros com o algoritmo SA-IS.
+
+    Classifica cada posição como tipo S ou L, ordena as subcadeias LMS por indução,
+    resolve recursivamente a sequência reduzida quando existem subcadeias repetidas e
+    induz a ordem final de todos os sufixos. O fim da sequência é tratado como um
+    símbolo menor do que todos os outros. Executa em tempo O(n) e memória O(n).
+
+    Args:
+        seq (list): Sequência de inteiros entre 0 e maior_simbolo.
+        maior_simbolo (int): Maior valor que pode ocorrer na sequência.
+
+    Returns:
+        list: Posições iniciais dos sufixos da sequência por ordem lexicográfica.
+    """
+    n = len(seq)
+    if n == 0:
+        return []
+    if n == 1:
+        return [0]
+    if n == 2:
+        return [0, 1] if seq[0] < seq[1] else [1, 0]
+
+    sa = [0] * n
+    tipo_s = [False] * n                                            # True nas posições de tipo S (sufixo menor que o seguinte).
+    for i in range(n - 2, -1, -1):
+        tipo_s[i] = tipo_s[i + 1] if seq[i] == seq[i + 1] else seq[i] < seq[i + 1]
+
+    inicio_l = [0] * (maior_simbolo + 1)                            # Início da zona L de cada balde.
+    inicio_s = [0] * (maior_simbolo + 1)                            # Início da zona S de cada balde.
+    for i in range(n):
+        if not tipo_s[i]:
+            inicio_s[seq[i]] += 1
+        else:
+            inicio_l[seq[i] + 1] += 1
+    for c in range(maior_simbolo + 1):
+        inicio_s[c] += inicio_l[c]
+        if c < maior_simbolo:
+            inicio_l[c + 1] += inicio_s[c]
+
+    def induz(lms):
+        for i in range(n):
+            sa[i] = -1
+        balde = inicio_s[:]
+        for p in lms:                                               # Coloca as posições LMS no início da zona S do seu balde.
+            sa[balde[seq[p]]] = p
+            balde[seq[p]] += 1
+        balde = inicio_l[:]
+        sa[balde[seq[n - 1]]] = n - 1
+        balde[seq[n - 1]] += 1
+        for i in range(n):                                          # Induz os sufixos de tipo L da esquerda para a direita.
+            p = sa[i] - 1
+            if p >= 0 and not tipo_s[p]:
+                sa[balde[seq[p]]] = p
+                balde[seq[p]] += 1
+        balde = inicio_l[:]
+        for i in range(n - 1, -1, -1):                              # Induz os sufixos de tipo S da direita para a esquerda.
+            p = sa[i] - 1
+            if p >= 0 and tipo_s[p]:
+                balde[seq[p] + 1] -= 1
+                sa[balde[seq[p] + 1]] = p
+
+    indice_lms = [-1] * (n + 1)                                     # Ordem de cada posição LMS no texto (-1 se não for LMS).
+    lms = []
+    for i in range(1, n):
+        if not tipo_s[i - 1] and tipo_s[i]:
+            indice_lms[i] = len(lms)
+            lms.append(i)
+    m = len(lms)
+
+    induz(lms)
+
+    if m:
+        lms_ordenados = [p for p in sa if indice_lms[p] != -1]
+        reduzida = [0] * m                                          # Nome de cada subcadeia LMS, pela ordem no texto.
+        nome = 0
+        for i in range(1, m):
+            a, b = lms_ordenados[i - 1], lms_ordenados[i]
+            fim_a = lms[indice_lms[a] + 1] if indice_lms[a] + 1 < m else n
+            fim_b = lms[indice_lms[b] + 1] if indice_lms[b] + 1 < m else n
+            iguais = fim_a - a == fim_b - b
+            if iguais:
+                while a < fim_a and seq[a] == seq[b]:
+                    a += 1
+                    b += 1
+                if a == n or seq[a] != seq[b]:
+                    iguais = False
+            if not iguais:
+                nome += 1
+            reduzida[indice_lms[lms_ordenados[i]]] = nome
+        sa_reduzido = sa_is(reduzida, nome)                         # Ordena as subcadeias LMS resolvendo a sequência reduzida.
+        induz([lms[i] for i in sa_reduzido])
+    return sa
+
 if __name__ == "__main__":
     seq_dna = "ACGTACGT$"
     bwt_dna = BWT(seq_dna)
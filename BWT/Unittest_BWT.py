@@ -1,6 +1,8 @@
 
+import os
+import tempfile
 import unittest
-from BWT import BWT
+from BWT import BWT, BWTEmpacotada, BWTGeneralizada, BWTRunLength, le_sequencias
 
 class TestBWT(unittest.TestCase):
     """
@@ -46,6 +48,19 @@ class TestBWT(unittest.TestCase):
             msg="A inversão da BWT não retornou o texto original."
         )
 
+    def test_inversa_bwt_blocos(self):
+        """
+        Testa a inversão da BWT em blocos.
+
+        Verifica se os blocos produzidos têm no máximo o tamanho pedido e se, juntos, recuperam o texto original.
+        """
+        blocos = list(self.instancia_bwt.inversa_bwt_blocos(tamanho_bloco=3))
+        self.assertEqual(
+            blocos,
+            ["ban", "ana", "$"],
+            msg="A inversão da BWT em blocos não retornou os blocos esperados."
+        )
+
     def test_array_sufixos(self):
         """
         Testa a construção do array de sufixos.
@@ -59,6 +74,27 @@ class TestBWT(unittest.TestCase):
             msg="O array de sufixos calculado não está correto."
         )
 
+    def test_array_sufixos_sais(self):
+        """
+        Testa a construção do array de sufixos com o SA-IS num texto mais longo.
+
+        Compara a BWT e o array de sufixos obtidos com os resultados da ordenação direta das rotações,
+        num texto repetitivo que obriga à recursão do algoritmo.
+        """
+        texto = "ACGTTGCAACGTACGTTTGACAACGGTACGTACGTTGCA" * 3 + "$"
+        rotacoes = sorted(range(len(texto)), key=lambda i: texto[i:] + texto[:i])
+        instancia = BWT(texto, constroi_array_sufixos=True)
+        self.assertEqual(
+            instancia.sa,
+            rotacoes,
+            msg="O array de sufixos calculado com o SA-IS não está correto."
+        )
+        self.assertEqual(
+            instancia.bwt,
+            "".join(texto[i - 1] for i in rotacoes),
+            msg="A BWT calculada a partir do array de sufixos não está correta."
+        )
+
     def test_correspondencia_bw(self):
         """
         Testa a função de correspondência backward search (correspondencia_bw).
@@ -86,6 +122,241 @@ class TestBWT(unittest.TestCase):
             msg="correspondencia_bw_prefixo não retornou as posições corretas no texto."
         )
 
+    def test_fm_index(self):
+        """
+        Testa as tabelas C e Occ do FM-index.
+
+        Verifica a tabela C para "banana$" e compara as contagens de ocorrências, com pontos de
+        controlo espaçados de 2 linhas, com a contagem direta sobre a BWT.
+        """
+        instancia = BWT(self.texto, passo_occ=2)
+        self.assertEqual(
+            instancia.c,
+            {"$": 0, "a": 1, "b": 4, "n": 5},
+            msg="A tabela C do FM-index não está correta."
+        )
+        for c in "$abn":
+            for i in range(len(instancia.bwt) + 1):
+                self.assertEqual(
+                    instancia.ocorrencias(c, i),
+                    instancia.bwt[:i].count(c),
+                    msg=f"ocorrencias('{c}', {i}) não corresponde à contagem direta."
+                )
+        self.assertEqual(
+            instancia.correspondencia_bw("ana"),
+            [2, 3],
+            msg="correspondencia_bw não retornou os índices esperados com passo_occ=2."
+        )
+
+    def test_array_sufixos_amostrado(self):
+        """
+        Testa a localização de ocorrências com o array de sufixos amostrado.
+
+        Sem o array de sufixos completo, verifica se localiza() recupera todas as posições do array
+        de sufixos de "banana$" e se as posições do padrão "ana" continuam corretas.
+        """
+        instancia = BWT(self.texto, constroi_array_sufixos=False, passo_sa=3)
+        self.assertFalse(hasattr(instancia, "sa"), msg="O array de sufixos completo não deveria ser guardado.")
+        self.assertEqual(
+            [instancia.localiza(i) for i in range(len(self.texto))],
+            [6, 5, 3, 1, 0, 4, 2],
+            msg="localiza() não recuperou o array de sufixos a partir da amostra."
+        )
+        self.assertEqual(
+            instancia.correspondencia_bw_prefixo("ana"),
+            [1, 3],
+            msg="correspondencia_bw_prefixo não retornou as posições corretas com o array de sufixos amostrado."
+        )
+
+    def test_bwt_empacotada(self):
+        """
+        Testa a representação da BWT com 2 bits por base.
+
+        Para uma sequência de DNA, verifica se a BWT empacotada coincide com a BWT em string e se as
+        correspondências, as posições e a inversão se mantêm. Verifica também se uma sequência que não é
+        DNA é rejeitada.
+        """
+        texto = "ACGTTGCAACGTACGTTTGACAACGGTACGTACGTTGCA$"
+        normal = BWT(texto, passo_occ=8)
+        empacotada = BWT(texto, passo_occ=8, empacotada=True)
+        self.assertEqual(str(empacotada.bwt), normal.bwt, msg="A BWT empacotada não coincide com a BWT em string.")
+        for padrao in ["ACG", "GTT", "CAA", "TTTT", ""]:
+            self.assertEqual(
+                empacotada.correspondencia_bw(padrao),
+                normal.correspondencia_bw(padrao),
+                msg=f"correspondencia_bw difere na BWT empacotada para o padrão '{padrao}'."
+            )
+            self.assertEqual(
+                empacotada.correspondencia_bw_prefixo(padrao),
+                normal.correspondencia_bw_prefixo(padrao),
+                msg=f"correspondencia_bw_prefixo difere na BWT empacotada para o padrão '{padrao}'."
+            )
+        self.assertEqual(empacotada.inversa_bwt(), texto, msg="A inversão da BWT empacotada falhou.")
+        self.assertFalse(hasattr(empacotada, "sa"), msg="A BWT empacotada não deveria guardar o array de sufixos completo.")
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "dna.idx")
+            empacotada.guarda(caminho)
+            carregada = BWT.carrega(caminho)
+            self.assertIsInstance(carregada.bwt, BWTEmpacotada, msg="A BWT carregada deveria continuar empacotada.")
+            self.assertEqual(str(carregada.bwt), normal.bwt, msg="A BWT empacotada carregada não coincide com a original.")
+            self.assertEqual(
+                carregada.correspondencia_bw_prefixo("ACG"),
+                normal.correspondencia_bw_prefixo("ACG"),
+                msg="correspondencia_bw_prefixo difere na BWT empacotada carregada."
+            )
+            del carregada
+        with self.assertRaises(ValueError):
+            BWT(self.texto, empacotada=True)
+
+    def test_correspondencia_aproximada(self):
+        """
+        Testa a procura com substituições.
+
+        Verifica o array D do padrão "anx" e as posições encontradas para o padrão "bnn" com zero, uma e
+        duas substituições.
+        """
+        self.assertEqual(
+            self.instancia_bwt.limites_diferencas("anx"),
+            [0, 0, 1],
+            msg="limites_diferencas não retornou o array D esperado."
+        )
+        self.assertEqual(self.instancia_bwt.correspondencia_aproximada_prefixo("bnn", 0), [])
+        self.assertEqual(
+            self.instancia_bwt.correspondencia_aproximada_prefixo("bnn", 1),
+            [(0, 1)],
+            msg="A procura com uma substituição não retornou as posições esperadas."
+        )
+        self.assertEqual(
+            self.instancia_bwt.correspondencia_aproximada_prefixo("bnn", 2),
+            [(0, 1), (1, 2), (2, 2), (3, 2)],
+            msg="A procura com duas substituições não retornou as posições esperadas."
+        )
+
+    def test_bwt_run_length(self):
+        """
+        Testa a BWT comprimida por run-length.
+
+        Numa coleção de cópias quase idênticas, verifica se o número de runs é muito menor do que o
+        tamanho do texto e se as correspondências, as posições e a inversão coincidem com as da BWT,
+        também depois de guardar e carregar o índice.
+        """
+        genoma = "ACGTTGCAACGTACGTTTGACAACGGTACGTACGTTGCA"
+        texto = genoma + genoma.replace("TTT", "TAT") + genoma + genoma.replace("GGT", "GCT") + "$"
+        normal = BWT(texto)
+        comprimida = BWTRunLength(texto)
+        self.assertEqual(str(comprimida.bwt), normal.bwt, msg="A BWT por runs não coincide com a BWT.")
+        self.assertLess(len(comprimida.bwt.cabecas), len(texto) // 2, msg="A BWT por runs deveria ter menos runs.")
+        for padrao in ["ACG", "TAT", "GCAACG", "CCCC", ""]:
+            self.assertEqual(
+                comprimida.correspondencia_bw(padrao),
+                normal.correspondencia_bw(padrao),
+                msg=f"correspondencia_bw difere na BWT por runs para o padrão '{padrao}'."
+            )
+            self.assertEqual(
+                comprimida.correspondencia_bw_prefixo(padrao),
+                normal.correspondencia_bw_prefixo(padrao),
+                msg=f"correspondencia_bw_prefixo difere na BWT por runs para o padrão '{padrao}'."
+            )
+        self.assertEqual(comprimida.inversa_bwt(), texto, msg="A inversão da BWT por runs falhou.")
+        self.assertEqual(
+            comprimida.correspondencia_aproximada_prefixo("TAT", 1),
+            normal.correspondencia_aproximada_prefixo("TAT", 1),
+            msg="correspondencia_aproximada_prefixo difere na BWT por runs."
+        )
+        self.assertEqual(
+            comprimida.procura_lote(["ACG", "TAT"], processos=2),
+            normal.procura_lote(["ACG", "TAT"]),
+            msg="procura_lote difere na BWT por runs."
+        )
+        self.assertEqual(
+            [comprimida.localiza(linha) for linha in range(len(texto))],
+            normal.sa,
+            msg="localiza difere do array de sufixos na BWT por runs."
+        )
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "runs.idx")
+            comprimida.guarda(caminho)
+            carregada = BWTRunLength.carrega(caminho)
+            self.assertIsInstance(BWT.carrega(caminho), BWTRunLength, msg="BWT.carrega deveria devolver uma BWTRunLength.")
+            self.assertEqual(str(carregada.bwt), normal.bwt, msg="A BWT por runs carregada não coincide com a BWT.")
+            for padrao in ["ACG", "TAT", "GCAACG", "CCCC"]:
+                self.assertEqual(
+                    carregada.correspondencia_bw_prefixo(padrao),
+                    normal.correspondencia_bw_prefixo(padrao),
+                    msg=f"correspondencia_bw_prefixo difere na BWT por runs carregada para o padrão '{padrao}'."
+                )
+            self.assertEqual(
+                carregada.correspondencia_aproximada_prefixo("TAT", 1),
+                normal.correspondencia_aproximada_prefixo("TAT", 1),
+                msg="correspondencia_aproximada_prefixo difere na BWT por runs carregada."
+            )
+            normal.guarda(os.path.join(pasta, "normal.idx"))
+            with self.assertRaises(ValueError):
+                BWTRunLength.carrega(os.path.join(pasta, "normal.idx"))
+            with open(caminho, "rb") as f:
+                dados = f.read()
+            with open(caminho, "wb") as f:
+                f.write(dados[:-8])
+            with self.assertRaises(ValueError):
+                BWTRunLength.carrega(caminho)
+            del carregada
+        redefinida = BWTRunLength()
+        redefinida.define_bwt(normal.bwt)
+        self.assertEqual(redefinida.correspondencia_bw_prefixo("ACG"), normal.correspondencia_bw_prefixo("ACG"),
+                         msg="define_bwt não reconstruiu a BWT por runs.")
+        with self.assertRaises(ValueError):
+            redefinida.define_bwt("ACGT")
+
+    def test_bwt_generalizada(self):
+        """
+        Testa a BWT de um conjunto de sequências.
+
+        Verifica se as ocorrências são devolvidas como pares (sequência, posição), com o array de sufixos
+        completo e amostrado, e se a inversão recupera as sequências concatenadas.
+        """
+        sequencias = ["banana", "ananas$", "cabana"]
+        esperado = [(0, 1), (0, 3), (1, 0), (1, 2), (2, 3)]
+        for passo_sa in (None, 3):
+            instancia = BWTGeneralizada(sequencias, passo_occ=2, passo_sa=passo_sa)
+            self.assertEqual(
+                instancia.correspondencia_sequencias("ana"),
+                esperado,
+                msg=f"correspondencia_sequencias não retornou os pares esperados com passo_sa={passo_sa}."
+            )
+            self.assertEqual(instancia.correspondencia_sequencias("nab"), [], msg="Um padrão não pode atravessar duas sequências.")
+            self.assertEqual(
+                instancia.inversa_bwt(),
+                "banana$ananas$cabana$",
+                msg="A inversão da BWT generalizada não recuperou as sequências."
+            )
+
+    def test_bwt_generalizada_guarda_e_procura_lote(self):
+        """
+        Testa a gravação e o carregamento de uma BWT generalizada e a procura de padrões em vários processos.
+
+        Verifica se carrega() devolve uma BWTGeneralizada com as mesmas posições e se procura_lote com dois
+        processos coincide com a procura no processo atual, com o array de sufixos completo e amostrado.
+        """
+        padroes = ["ban", "ana", "s", "xyz"]
+        for passo_sa in (None, 3):
+            instancia = BWTGeneralizada(["banana", "ananas", "cabana"], passo_sa=passo_sa)
+            with tempfile.TemporaryDirectory() as pasta:
+                caminho = os.path.join(pasta, "sequencias.idx")
+                instancia.guarda(caminho)
+                carregada = BWT.carrega(caminho)
+                self.assertIsInstance(carregada, BWTGeneralizada, msg="O índice carregado deveria ser uma BWTGeneralizada.")
+                self.assertEqual(
+                    carregada.correspondencia_sequencias("ana"),
+                    instancia.correspondencia_sequencias("ana"),
+                    msg=f"As ocorrências no índice carregado diferem com passo_sa={passo_sa}."
+                )
+                del carregada
+            self.assertEqual(
+                instancia.procura_lote(padroes, processos=2, tamanho_lote=1),
+                instancia.procura_lote(padroes),
+                msg=f"procura_lote com vários processos difere na BWT generalizada com passo_sa={passo_sa}."
+            )
+
     def test_correspondencia_bw_sem_correspondencia(self):
         """
         Testa a correspondência backward search para um padrão inexistente.
@@ -98,6 +369,81 @@ class TestBWT(unittest.TestCase):
             msg="correspondencia_bw deveria retornar uma lista vazia para padrões não encontrados."
         )
 
+    def test_guarda_e_carrega(self):
+        """
+        Testa a gravação do índice em ficheiro e o seu carregamento mapeado em memória.
+
+        Verifica se o índice carregado produz a mesma BWT, as mesmas correspondências e posições
+        e a mesma inversão que o índice original.
+        """
+        instancia = BWT(self.texto, constroi_array_sufixos=False, passo_occ=2, passo_sa=2)
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "banana.idx")
+            instancia.guarda(caminho)
+            carregada = BWT.carrega(caminho)
+            self.assertEqual(str(carregada.bwt), instancia.bwt, msg="A BWT carregada não corresponde à original.")
+            self.assertEqual(
+                carregada.correspondencia_bw("ana"),
+                [2, 3],
+                msg="correspondencia_bw não retornou os índices esperados no índice carregado."
+            )
+            self.assertEqual(
+                carregada.correspondencia_bw_prefixo("ana"),
+                [1, 3],
+                msg="correspondencia_bw_prefixo não retornou as posições corretas no índice carregado."
+            )
+            self.assertEqual(carregada.inversa_bwt(), self.texto, msg="A inversão do índice carregado falhou.")
+            del carregada
+
+    def test_carrega_ficheiro_invalido(self):
+        """
+        Testa o carregamento de um ficheiro que não é um índice BWT ou que está truncado.
+
+        Verifica se é lançado um ValueError.
+        """
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "invalido.idx")
+            with open(caminho, "wb") as f:
+                f.write(b"nao e um indice" * 4)
+            with self.assertRaises(ValueError):
+                BWT.carrega(caminho)
+            self.instancia_bwt.guarda(caminho)
+            with open(caminho, "rb") as f:
+                dados = f.read()
+            for tamanho in (len(dados) - 8, len(dados) // 2, 100):
+                with open(caminho, "wb") as f:
+                    f.write(dados[:tamanho])
+                with self.assertRaises(ValueError, msg=f"Um índice truncado em {tamanho} bytes deveria ser rejeitado."):
+                    BWT.carrega(caminho)
+
+    def test_procura_lote(self):
+        """
+        Testa a procura de vários padrões de uma só vez.
+
+        Verifica os resultados no processo atual e compara-os com os obtidos distribuindo os padrões por dois processos.
+        """
+        padroes = ["ana", "b", "xyz", ""]
+        resultado = self.instancia_bwt.procura_lote(padroes)
+        self.assertEqual(
+            resultado[:3],
+            [("ana", (2, 3), [1, 3]), ("b", (4, 4), [0]), ("xyz", (0, -1), [])],
+            msg="procura_lote não retornou os intervalos e posições esperados."
+        )
+        self.assertEqual(
+            self.instancia_bwt.procura_lote(iter(padroes), processos=2, tamanho_lote=1),
+            resultado,
+            msg="procura_lote com vários processos não coincide com a procura no processo atual."
+        )
+
+    def test_le_sequencias(self):
+        """
+        Testa a leitura de sequências nos formatos FASTA e FASTQ.
+        """
+        fasta = [">seq1\n", "ACGT\n", "ACG\n", ">seq2\n", "TTA\n"]
+        fastq = ["@read1\n", "ACGT\n", "+\n", "IIII\n", "@read2\n", "GGA\n", "+\n", "III\n"]
+        self.assertEqual(list(le_sequencias(fasta)), ["ACGTACG", "TTA"], msg="Leitura de FASTA incorreta.")
+        self.assertEqual(list(le_sequencias(fastq)), ["ACGT", "GGA"], msg="Leitura de FASTQ incorreta.")
+
     def test_define_bwt(self):
         """
         Testa o método define_bwt.
@@ -1,21 +1,200 @@
+import heapq
+import json
+import os
+import random
+import struct
+import sys
+from array import array
+from collections import deque
+from collections.abc import Mapping
+from multiprocessing import Pool
+
+
+GRAPH_FORMAT_VERSION = 2
+GRAPH_MAGIC = b"MYGRAPH\0"
+GRAPH_HEADER = struct.Struct("<8sHBcQQQ")   # magic, version, little endian?, weight typecode, nodes, edges, label bytes
+
+
+def _as_list(values):
+    """
+    values as a list of plain Python scalars (tolist() for array.array and NumPy arrays).
+    """
+    return values.tolist() if hasattr(values, "tolist") else list(values)
+
+
 class MyGraph:
     """
     Basic directed weighted graph class providing essential methods for 
     graph manipulation and traversal, including shortest path computation, 
     reachability, and cycle detection.
+    Derived results (edge list, degree maps, CSR snapshot, distance caches) are memoized
+    until the next add_vertex/add_edge, so always mutate the graph through them.
     """
 
-    def __init__(self, g = {}):
-        self.graph = g
+    def __init__(self, g = None):
+        self.graph = g if g is not None else {}
+        preds = {v: [] for v in self.graph}           # reverse adjacency (origin, weight), kept in sync by add_vertex/add_edge
+        for v, adjacent in self.graph.items():
+            for d, w in adjacent:
+                if d not in preds:
+                    preds[d] = []
+                preds[d].append((v, w))
+        self._preds = preds
+        self._n_edges = sum(len(adjacent) for adjacent in self.graph.values())
+        self._version = 0                              # bumped by add_vertex/add_edge
+        self._cache = {}                               # derived results of the current version
+
+    @property
+    def version(self):
+        """
+        Mutation counter: changes whenever a vertex or an edge is added.
+        """
+        return self._version
+
+    def _touch(self):
+        self._version += 1
+        self._cache.clear()
+
+    def _lookup(self, key):
+        return self._cache.get(key)
+
+    def _store(self, key, value):
+        self._cache[key] = value
+        return value
+
+    def memoize(self, key, compute, *args):
+        """
+        Return the result memoized under key for the current version, computing it with
+        compute(*args) if needed. Also used by code outside this class to cache results
+        derived from the graph until the next mutation.
+        """
+        if key in self._cache:
+            return self._cache[key]
+        return self._store(key, compute(*args))
+
+    @classmethod
+    def from_edges(cls, edges, default_weight=1):
+        """
+        Build a graph in one pass from an iterable of (origin, dest, weight) or (origin, dest) edges.
+        """
+        g = {}
+        for edge in edges:
+            o, d = edge[0], edge[1]
+            if o not in g:
+                g[o] = []
+            if d not in g:
+                g[d] = []
+            g[o].append((d, edge[2] if len(edge) > 2 else default_weight))
+        return cls(g)
+
+    @classmethod
+    def from_arrays(cls, sources, targets, weights=None, labels=None):
+        """
+        Build a graph from parallel sequences (lists, arrays, NumPy arrays, ...) of origin and
+        destination node ids, with optional weights (default 1) and an optional id -> label sequence.
+        Array elements are converted to plain Python scalars with tolist(), so NumPy ids and
+        weights behave like ints and floats in freeze() and save().
+        """
+        sources, targets = _as_list(sources), _as_list(targets)
+        if weights is not None:
+            weights = _as_list(weights)
+        if labels is not None:
+            labels = _as_list(labels)
+            sources = [labels[i] for i in sources]
+            targets = [labels[i] for i in targets]
+        if weights is None:
+            weights = [1] * len(sources)
+        g = {v: [] for v in labels} if labels is not None else {}
+        for o, d, w in zip(sources, targets, weights):
+            if o not in g:
+                g[o] = []
+            if d not in g:
+                g[d] = []
+            g[o].append((d, w))
+        return cls(g)
+
+    @classmethod
+    def from_tsv(cls, path, sep="\t", chunk_size=100000):
+        """
+        Build a graph from an edge-list file (origin, dest[, weight] per line), read in chunks.
+        """
+        return cls.from_edges(edge for chunk in read_edge_chunks(path, sep, chunk_size) for edge in chunk)
+
+    def to_tsv(self, path, sep="\t"):
+        """
+        Write the graph as an edge-list file readable by from_tsv (isolated nodes are not kept).
+        """
+        with open(path, "w") as f:
+            for v in self.graph:
+                for d, w in self.graph[v]:
+                    f.write(f"{v}{sep}{d}{sep}{w}\n")
+
+    def save(self, path):
+        """
+        Save the graph in a compact binary format: a versioned header, the node labels as a
+        JSON list and the raw CSR offsets, targets and weights arrays.
+        Labels must be JSON scalars (str, int, float, bool or None).
+        """
+        csr = self.freeze()
+        if not all(v is None or isinstance(v, (str, int, float, bool)) for v in csr.labels):
+            raise ValueError("Only str, int, float, bool or None node labels can be saved")
+        labels = json.dumps(csr.labels).encode("utf-8")
+        with open(path, "wb") as f:
+            f.write(GRAPH_HEADER.pack(GRAPH_MAGIC, GRAPH_FORMAT_VERSION, sys.byteorder == "little",
+                                      csr.weights.typecode.encode(), len(csr.labels), len(csr.targets), len(labels)))
+            f.write(labels)
+            csr.offsets.tofile(f)
+            csr.targets.tofile(f)
+            csr.weights.tofile(f)
+
+    @classmethod
+    def load(cls, path, frozen=False):
+        """
+        Load a graph written by save(); returns a CSRGraph if frozen is True.
+        Raises ValueError if the file is not a graph file or has an unsupported version.
+        """
+        with open(path, "rb") as f:
+            header = f.read(GRAPH_HEADER.size)
+            if len(header) < GRAPH_HEADER.size or header[:len(GRAPH_MAGIC)] != GRAPH_MAGIC:
+                raise ValueError(f"Not a graph file: {path}")
+            _, version, little, typecode, n, m, label_bytes = GRAPH_HEADER.unpack(header)
+            if version != GRAPH_FORMAT_VERSION:
+                raise ValueError(f"Unsupported graph file version: {version}")
+            if typecode not in (b"q", b"d"):
+                raise ValueError(f"Invalid weight type in graph file: {typecode!r}")
+            labels = json.loads(f.read(label_bytes).decode("utf-8"))
+            offsets, targets, weights = array('q'), array('i'), array(typecode.decode())
+            try:
+                offsets.fromfile(f, n + 1)
+                targets.fromfile(f, m)
+                weights.fromfile(f, m)
+            except EOFError:
+                raise ValueError(f"Truncated graph file: {path}") from None
+        if little != (sys.byteorder == "little"):
+            for a in (offsets, targets, weights):
+                a.byteswap()
+        csr = CSRGraph.from_arrays(labels, offsets, targets, weights)
+        if frozen:
+            return csr
+        return cls({v: csr.graph[v] for v in labels})
 
     def print_graph(self):
         for v in self.graph:
             print(v, "->", self.graph[v])
 
+    def freeze(self):
+        """
+        Return a read-only CSR snapshot of the graph (see CSRGraph), shared until the next mutation.
+        """
+        return self.memoize("csr", CSRGraph, self)
+
     def get_nodes(self):
         return list(self.graph.keys())
 
     def get_edges(self):
+        return list(self.memoize("edges", self._edge_list))
+
+    def _edge_list(self):
         edges = []
         for v in self.graph:
             for d, w in self.graph[v]:
@@ -23,11 +202,13 @@ class MyGraph:
         return edges
 
     def size(self):
-        return len(self.get_nodes()), len(self.get_edges())
+        return len(self.graph), self._n_edges
 
     def add_vertex(self, v):
         if v not in self.graph:
             self.graph[v] = []
+            self._preds.setdefault(v, [])
+            self._touch()
 
     def add_edge(self, o, d, w):
         if o not in self.graph:
@@ -35,17 +216,18 @@ class MyGraph:
         if d not in self.graph:
             self.add_vertex(d)
         self.graph[o].append((d, w))
+        self._preds[d].append((o, w))
+        self._n_edges += 1
+        self._touch()
 
     def get_successors(self, v):
         return [dest for dest, _ in self.graph[v]]
 
     def get_predecessors(self, v):
-        preds = []
-        for node in self.graph:
-            for dest, _ in self.graph[node]:
-                if dest == v:
-                    preds.append(node)
-        return preds
+        return [o for o, _ in self._preds.get(v, [])]
+
+    def _in_edges(self, v):
+        return self._preds.get(v, [])
 
     def get_adjacents(self, v):
         return list(set(self.get_successors(v) + self.get_predecessors(v)))
@@ -54,127 +236,708 @@ class MyGraph:
         return len(self.graph[v])
 
     def in_degree(self, v):
-        return len(self.get_predecessors(v))
+        return len(self._preds.get(v, []))
 
     def degree(self, v):
         return self.in_degree(v) + self.out_degree(v)
 
+    def out_degrees(self):
+        """
+        Out-degree of every node (memoized until the next mutation; do not modify).
+        """
+        return self.memoize("out_degrees", lambda: {v: self.out_degree(v) for v in self.graph})
+
+    def in_degrees(self):
+        """
+        In-degree of every node (memoized until the next mutation; do not modify).
+        """
+        return self.memoize("in_degrees", lambda: {v: self.in_degree(v) for v in self.graph})
+
     def distance(self, s, d):
         if s == d: return 0
-        dist, _ = self._dijkstra(s)
-        return dist.get(d, None)
+        apsp = self._lookup("apsp")
+        if apsp is not None:
+            ids, _, dist, _ = apsp
+            if s not in ids or d not in ids:
+                return None
+            value = dist[ids[s] * len(ids) + ids[d]]
+            return None if value < 0 else value
+        dist, _ = self._point_to_point(s, d)
+        return dist
 
     def shortest_path(self, s, d):
         if s == d: return [s]
-        dist, prev = self._dijkstra(s)
-        if d not in dist:
+        if self._lookup("apsp") is not None:
+            return self._apsp_path(s, d)
+        _, path = self._point_to_point(s, d)
+        return path
+
+    def _point_to_point(self, s, d):
+        """
+        Single pair search: A* with landmarks (ALT) if prepare_landmarks() was called,
+        bidirectional Dijkstra otherwise.
+        Returns:
+            tuple: (distance, path), or (None, None) if d is unreachable from s.
+        """
+        landmarks = self._lookup("landmarks")
+        if landmarks is not None:
+            return self._alt_search(s, d, landmarks)
+        return self._bidirectional_dijkstra(s, d)
+
+    def _bidirectional_dijkstra(self, s, d):
+        """
+        Dijkstra run simultaneously forward from s and backward (over predecessors) from d,
+        always expanding the side with the smaller frontier, until the two frontiers can no
+        longer improve the best meeting point.
+        """
+        dist = ({s: 0}, {d: 0})
+        prev = ({}, {})
+        settled = (set(), set())
+        heaps = ([(0, 0, s)], [(0, 0, d)])
+        counter = 1
+        best, meet = float('inf'), None
+        while heaps[0] and heaps[1]:
+            for side in (0, 1):                          # drop entries of already settled nodes
+                while heaps[side] and heaps[side][0][2] in settled[side]:
+                    heapq.heappop(heaps[side])
+            if not heaps[0] or not heaps[1] or heaps[0][0][0] + heaps[1][0][0] >= best:
+                break
+            side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+            du, _, u = heapq.heappop(heaps[side])
+            settled[side].add(u)
+            edges = self.graph[u] if side == 0 else self._in_edges(u)
+            for v, weight in edges:
+                new_dist = du + weight
+                if new_dist < dist[side].get(v, float('inf')):
+                    dist[side][v] = new_dist
+                    prev[side][v] = u
+                    heapq.heappush(heaps[side], (new_dist, counter, v))
+                    counter += 1
+                    if v in dist[1 - side] and new_dist + dist[1 - side][v] < best:
+                        best, meet = new_dist + dist[1 - side][v], v
+        if meet is None:
+            return None, None
+        path = [meet]
+        while path[-1] != s:
+            path.append(prev[0][path[-1]])
+        path.reverse()
+        while path[-1] != d:
+            path.append(prev[1][path[-1]])
+        return best, path
+
+    def prepare_landmarks(self, k=4, seed=None):
+        """
+        Precompute distances from and to k landmarks for ALT (A*, landmarks, triangle
+        inequality) point-to-point queries. Landmarks are picked by farthest-point
+        selection starting from a random node. Dropped on every mutation.
+        """
+        nodes = self.get_nodes()
+        if not nodes:
+            self._store("landmarks", [])
+            return []
+        rng = random.Random(seed)
+        chosen = [rng.choice(nodes)]
+        closest = {}
+        landmarks = []
+        while True:
+            landmark = chosen[-1]
+            from_l, _ = self._dijkstra(landmark)
+            to_l, _ = self._dijkstra(landmark, reverse=True)
+            landmarks.append((from_l, to_l))
+            for v, dv in from_l.items():
+                closest[v] = min(closest.get(v, float('inf')), dv)
+            if len(chosen) == min(k, len(nodes)):
+                break
+            candidates = [v for v in nodes if v not in chosen]
+            chosen.append(max(candidates, key=lambda v: closest.get(v, float('inf'))))
+        self._store("landmarks", landmarks)
+        return chosen
+
+    def _alt_heuristic(self, v, d, landmarks):
+        """
+        Lower bound on distance(v, d) from the triangle inequality over all landmarks.
+        """
+        bound = 0
+        for from_l, to_l in landmarks:
+            if v in from_l and d in from_l:
+                bound = max(bound, from_l[d] - from_l[v])
+            if v in to_l and d in to_l:
+                bound = max(bound, to_l[v] - to_l[d])
+        return bound
+
+    def _alt_search(self, s, d, landmarks):
+        dist = {s: 0}
+        prev = {}
+        closed = set()
+        heap = [(self._alt_heuristic(s, d, landmarks), 0, 0, s)]
+        counter = 1
+        while heap:
+            _, du, _, u = heapq.heappop(heap)
+            if u in closed:
+                continue
+            if u == d:
+                path = [d]
+                while path[-1] != s:
+                    path.append(prev[path[-1]])
+                path.reverse()
+                return du, path
+            closed.add(u)
+            for v, weight in self.graph[u]:
+                new_dist = du + weight
+                if v not in closed and new_dist < dist.get(v, float('inf')):
+                    dist[v] = new_dist
+                    prev[v] = u
+                    heapq.heappush(heap, (new_dist + self._alt_heuristic(v, d, landmarks), new_dist, counter, v))
+                    counter += 1
+        return None, None
+
+    def all_pairs_shortest_paths(self):
+        """
+        Compute and cache the distance and predecessor matrices for every pair of nodes
+        (BFS per source when all weights are equal, Dijkstra per source otherwise).
+        While the graph is not mutated, distance() is then O(1) and shortest_path()
+        O(path length).
+        Returns:
+            tuple: (ids, labels, dist, pred) where ids maps node -> row, labels is the reverse
+            list, and dist/pred are flat n*n arrays indexed by ids[s] * n + ids[t]
+            (-1 for unreachable pairs / no predecessor).
+        """
+        return self.memoize("apsp", self._compute_apsp)
+
+    def _compute_apsp(self):
+        labels = list(self.graph)
+        ids = {v: i for i, v in enumerate(labels)}
+        n = len(labels)
+        weights = {w for v in self.graph for _, w in self.graph[v]}
+        unweighted = len(weights) <= 1
+        step = next(iter(weights), 1)
+        integral = all(isinstance(w, int) for w in weights)
+        dist = array('q' if integral else 'd', [-1]) * (n * n)
+        pred = array('q', [-1]) * (n * n)
+        for i, source in enumerate(labels):
+            row = i * n
+            if unweighted:
+                dist[row + i] = 0
+                queue = deque([source])
+                while queue:
+                    u = queue.popleft()
+                    ui = ids[u]
+                    for v, _ in self.graph[u]:
+                        vi = ids[v]
+                        if dist[row + vi] < 0:
+                            dist[row + vi] = dist[row + ui] + step
+                            pred[row + vi] = ui
+                            queue.append(v)
+            else:
+                d, prev = self._dijkstra(source)
+                for v, value in d.items():
+                    dist[row + ids[v]] = value
+                for v, p in prev.items():
+                    pred[row + ids[v]] = ids[p]
+        return ids, labels, dist, pred
+
+    def _apsp_path(self, s, d):
+        ids, labels, dist, pred = self._lookup("apsp")
+        if s not in ids or d not in ids:
             return None
-        path = []
-        current = d
-        while current != s:
-            path.append(current)
-            current = prev.get(current)
-            if current is None:
-                return None
-        path.append(s)
+        n, si = len(ids), ids[s]
+        current = ids[d]
+        if dist[si * n + current] < 0:
+            return None
+        path = [d]
+        while current != si:
+            current = pred[si * n + current]
+            path.append(labels[current])
         path.reverse()
         return path
 
-    def _dijkstra(self, source):
+    def single_source_distances(self, source):
+        """
+        Shortest distances and predecessors from a source node to every reachable node.
+        Returns:
+            tuple: (dist, prev) dicts; dist is ordered by increasing distance.
+        """
+        return self._dijkstra(source)
+
+    def _dijkstra(self, source, reverse=False):
         """
-        Dijkstra's algorithm to compute shortest paths from a source node.
+        Dijkstra's algorithm with a binary heap to compute shortest paths from a source node
+        (to it, following edges backwards, if reverse is True).
+        Only reachable nodes are returned, in the order they are settled.
         """
-        unvisited = {node: float('inf') for node in self.graph}
-        unvisited[source] = 0
+        dist = {}
         prev = {}
-        visited = {}
+        heap = [(0, 0, source)]
+        best = {source: 0}
+        counter = 1                      # tie-breaker so nodes themselves are never compared
 
-        while unvisited:
-            u = min(unvisited, key=unvisited.get)
-            current_dist = unvisited[u]
-            visited[u] = current_dist
-            del unvisited[u]
+        while heap:
+            current_dist, _, u = heapq.heappop(heap)
+            if u in dist:
+                continue
+            dist[u] = current_dist
 
-            for v, weight in self.graph[u]:
-                if v in visited:
+            for v, weight in (self._in_edges(u) if reverse else self.graph[u]):
+                if v in dist:
                     continue
                 new_dist = current_dist + weight
-                if new_dist < unvisited.get(v, float('inf')):
-                    unvisited[v] = new_dist
+                if new_dist < best.get(v, float('inf')):
+                    best[v] = new_dist
                     prev[v] = u
+                    heapq.heappush(heap, (new_dist, counter, v))
+                    counter += 1
 
-        return visited, prev
+        return dist, prev
 
     def reachable_bfs(self, v):
         """
         Perform BFS to find all reachable nodes from a given node.
         """
-        l = [v]
-        res = []
-        while l:
-            node = l.pop(0)
-            if node != v: res.append(node)
-            for elem, _ in self.graph[node]:
-                if elem not in res and elem not in l and elem != node:
-                    l.append(elem)
-        return res
+        return list(self.iter_bfs(v))
 
     def reachable_dfs(self, v):
         """
         Perform DFS to find all reachable nodes from a given node.
         """
-        l = [v]
-        res = []
-        while l:
-            node = l.pop(0)
-            if node != v: res.append(node)
-            s = 0
-            for elem, _ in self.graph[node]:
-                if elem not in res and elem not in l:
-                    l.insert(s, elem)
-                    s += 1
-        return res
+        return list(self.iter_dfs(v))
 
     def reachable_with_dist(self, s):
         """
         Perform BFS and return reachable nodes with their respective distances.
         """
-        res = []
-        l = [(s, 0)]
-        while l:
-            node, dist = l.pop(0)
-            if node != s:
-                res.append((node, dist))
+        return list(self.iter_with_dist(s))
+
+    def iter_bfs(self, v):
+        """
+        Lazily yield the nodes reachable from v (excluding v) in BFS order.
+        """
+        for node, _ in self.iter_with_dist(v):
+            yield node
+
+    def iter_dfs(self, v):
+        """
+        Lazily yield the nodes reachable from v (excluding v) in DFS preorder,
+        visiting successors in adjacency order.
+        """
+        visited = {v}
+        stack = [iter(self.graph[v])]
+        while stack:
+            for elem, _ in stack[-1]:
+                if elem not in visited:
+                    visited.add(elem)
+                    yield elem
+                    stack.append(iter(self.graph[elem]))
+                    break
+            else:
+                stack.pop()
+
+    def iter_with_dist(self, s):
+        """
+        Lazily yield (node, distance) for the nodes reachable from s (excluding s), in BFS order.
+        """
+        visited = {s}
+        queue = deque([(s, 0)])
+        while queue:
+            node, dist = queue.popleft()
             for elem, _ in self.graph[node]:
-                if not is_in_tuple_list(l, elem) and not is_in_tuple_list(res, elem):
-                    l.append((elem, dist + 1))
-        return res
+                if elem not in visited:
+                    visited.add(elem)
+                    yield elem, dist + 1
+                    queue.append((elem, dist + 1))
 
     def node_has_cycle(self, v):
         """
         Check if there is a cycle starting and ending at node v.
         """
-        l = [v]
-        visited = [v]
+        l = deque([v])
+        visited = {v}
         while l:
-            node = l.pop(0)
+            node = l.popleft()
             for elem, _ in self.graph[node]:
                 if elem == v:
                     return True
                 elif elem not in visited:
                     l.append(elem)
-                    visited.append(elem)
+                    visited.add(elem)
         return False
 
     def has_cycle(self):
         """
-        Check if the graph contains any cycle.
+        Check if the graph contains any cycle, in a single O(V + E) pass:
+        a cycle exists iff some SCC has more than one node or a node has a self-loop.
         """
-        for v in self.graph:
-            if self.node_has_cycle(v):
+        for component in self.strongly_connected_components():
+            if len(component) > 1:
+                return True
+            v = component[0]
+            if any(d == v for d, _ in self.graph[v]):
                 return True
         return False
 
+    def strongly_connected_components(self):
+        """
+        Tarjan's algorithm, iterative so deep graphs do not hit the recursion limit.
+        Returns:
+            list: Components (lists of nodes) in reverse topological order of the condensation.
+        """
+        index, low = {}, {}
+        stack, on_stack = [], set()
+        components = []
+        counter = 0
+        for root in self.graph:
+            if root in index:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(self.graph[root]))]
+            while work:
+                v, successors = work[-1]
+                for w, _ in successors:
+                    if w not in index:
+                        index[w] = low[w] = counter
+                        counter += 1
+                        stack.append(w)
+                        on_stack.add(w)
+                        work.append((w, iter(self.graph[w])))
+                        break
+                    elif w in on_stack:
+                        low[v] = min(low[v], index[w])
+                else:
+                    work.pop()
+                    if work:
+                        u = work[-1][0]
+                        low[u] = min(low[u], low[v])
+                    if low[v] == index[v]:
+                        component = []
+                        while True:
+                            w = stack.pop()
+                            on_stack.discard(w)
+                            component.append(w)
+                            if w == v:
+                                break
+                        components.append(component)
+        return components
+
+    def condensation(self):
+        """
+        Collapse each strongly connected component into a single node.
+        Returns:
+            tuple: (component, dag) where component maps each node to its component id and dag
+            is a MyGraph over component ids, keeping the lightest edge between two components.
+        """
+        components = self.strongly_connected_components()
+        component = {v: c for c, nodes in enumerate(components) for v in nodes}
+        lightest = {}
+        for v in self.graph:
+            for d, w in self.graph[v]:
+                key = (component[v], component[d])
+                if key[0] != key[1] and (key not in lightest or w < lightest[key]):
+                    lightest[key] = w
+        dag = MyGraph()
+        for c in range(len(components)):
+            dag.add_vertex(c)
+        for (o, d), w in lightest.items():
+            dag.add_edge(o, d, w)
+        return component, dag
+
+
+class CSRGraph(MyGraph):
+    """
+    Frozen compressed sparse row (CSR) snapshot of a MyGraph.
+    Nodes get integer ids (labels[i] <-> ids[label]); the successors of node i are
+    targets[offsets[i]:offsets[i + 1]] with the matching weights. Exposes the same
+    read API as MyGraph, so every traversal method works on it unchanged.
+    """
+
+    def __init__(self, g):
+        self.labels = g.get_nodes()
+        self.ids = {v: i for i, v in enumerate(self.labels)}
+        edges = [(d, w) for v in self.labels for d, w in g.graph[v]]
+        integral = all(isinstance(w, int) for _, w in edges)
+        self.offsets = array('q', [0])
+        self.targets = array('i', [self.ids[d] for d, _ in edges])
+        self.weights = array('q' if integral else 'd', [w for _, w in edges])
+        for v in self.labels:
+            self.offsets.append(self.offsets[-1] + len(g.graph[v]))
+        self.graph = _CSRAdjacency(self)
+        self._rev_offsets = None                 # reverse CSR, built on the first predecessor query
+        self._rev_sources = None
+        self._rev_weights = None
+        self._version = 0
+        self._cache = {}
+
+    @classmethod
+    def from_arrays(cls, labels, offsets, targets, weights):
+        """
+        Build a CSRGraph directly from its arrays (no MyGraph needed).
+        """
+        csr = cls.__new__(cls)
+        csr.labels = list(labels)
+        csr.ids = {v: i for i, v in enumerate(csr.labels)}
+        csr.offsets, csr.targets, csr.weights = offsets, targets, weights
+        csr.graph = _CSRAdjacency(csr)
+        csr._rev_offsets = csr._rev_sources = csr._rev_weights = None
+        csr._version = 0
+        csr._cache = {}
+        return csr
+
+    def __reduce__(self):
+        # pickle only the flat arrays and labels, not the dict-like view or caches
+        return CSRGraph.from_arrays, (self.labels, self.offsets, self.targets, self.weights)
+
+    def add_vertex(self, v):
+        raise TypeError("CSRGraph is frozen; add vertices to the MyGraph before freezing it")
+
+    def add_edge(self, o, d, w):
+        raise TypeError("CSRGraph is frozen; add edges to the MyGraph before freezing it")
+
+    def freeze(self):
+        return self
+
+    def get_nodes(self):
+        return list(self.labels)
+
+    def _edge_list(self):
+        labels, targets, weights = self.labels, self.targets, self.weights
+        return [(labels[i], labels[targets[k]], weights[k])
+                for i in range(len(labels)) for k in range(self.offsets[i], self.offsets[i + 1])]
+
+    def size(self):
+        return len(self.labels), len(self.targets)
+
+    def successor_ids(self, i):
+        """
+        Integer ids of the successors of node id i.
+        """
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def get_successors(self, v):
+        labels = self.labels
+        return [labels[t] for t in self.successor_ids(self.ids[v])]
+
+    def predecessor_ids(self, i):
+        """
+        Integer ids of the predecessors of node id i.
+        """
+        if self._rev_offsets is None:
+            self._build_reverse()
+        return self._rev_sources[self._rev_offsets[i]:self._rev_offsets[i + 1]]
+
+    def _build_reverse(self):
+        n = len(self.labels)
+        counts = [0] * (n + 1)
+        for t in self.targets:
+            counts[t + 1] += 1
+        for i in range(n):
+            counts[i + 1] += counts[i]
+        self._rev_offsets = array('q', counts)
+        fill = counts[:-1]
+        sources = array('i', bytes(4 * len(self.targets)))
+        weights = array(self.weights.typecode, bytes(self.weights.itemsize * len(self.weights)))
+        for i in range(n):
+            for k in range(self.offsets[i], self.offsets[i + 1]):
+                t = self.targets[k]
+                sources[fill[t]] = i
+                weights[fill[t]] = self.weights[k]
+                fill[t] += 1
+        self._rev_sources = sources
+        self._rev_weights = weights
+
+    def get_predecessors(self, v):
+        if v not in self.ids:
+            return []
+        labels = self.labels
+        return [labels[p] for p in self.predecessor_ids(self.ids[v])]
+
+    def _in_edges(self, v):
+        if v not in self.ids:
+            return []
+        if self._rev_offsets is None:
+            self._build_reverse()
+        i = self.ids[v]
+        labels, sources, weights = self.labels, self._rev_sources, self._rev_weights
+        return [(labels[sources[k]], weights[k]) for k in range(self._rev_offsets[i], self._rev_offsets[i + 1])]
+
+    def out_degree(self, v):
+        i = self.ids[v]
+        return self.offsets[i + 1] - self.offsets[i]
+
+    def in_degree(self, v):
+        if v not in self.ids:
+            return 0
+        return len(self.predecessor_ids(self.ids[v]))
+
+
+class _CSRAdjacency(Mapping):
+    """
+    Read-only dict-like view of a CSRGraph: label -> [(dest, weight), ...].
+    """
+
+    def __init__(self, csr):
+        self._csr = csr
+
+    def __getitem__(self, v):
+        csr = self._csr
+        i = csr.ids[v]
+        labels, targets, weights = csr.labels, csr.targets, csr.weights
+        return [(labels[targets[k]], weights[k]) for k in range(csr.offsets[i], csr.offsets[i + 1])]
+
+    def __contains__(self, v):
+        return v in self._csr.ids
+
+    def __iter__(self):
+        return iter(self._csr.labels)
+
+    def __len__(self):
+        return len(self._csr.labels)
+
+
+def memoized(graph, key, compute, *args):
+    """
+    compute(*args) memoized on graph under key when graph supports it (see MyGraph.memoize);
+    other graph-like objects get a fresh result on every call.
+    """
+    memoize = getattr(graph, "memoize", None)
+    if memoize is None:
+        return compute(*args)
+    return memoize(key, compute, *args)
+
+
+def as_csr(graph):
+    """
+    CSR snapshot of graph: graph.freeze() for a MyGraph, otherwise a CSRGraph with unit
+    weights built from any object with get_nodes() and get_successors(v).
+    """
+    if hasattr(graph, "freeze"):
+        return graph.freeze()
+    labels = list(graph.get_nodes())
+    ids = {v: i for i, v in enumerate(labels)}
+    offsets, targets = array('q', [0]), array('i')
+    for v in labels:
+        targets.extend(ids[d] for d in graph.get_successors(v))
+        offsets.append(len(targets))
+    return CSRGraph.from_arrays(labels, offsets, targets, array('q', [1]) * len(targets))
+
+
+class ParallelExecutor:
+    """
+    Runs independent per-source work (Dijkstra, BFS, ...) over a process pool.
+    The graph is frozen into a CSR snapshot that is sent once to each worker;
+    tasks only carry chunks of source nodes.
+    """
+
+    def __init__(self, graph, processes=None, chunks_per_process=4):
+        self.graph = as_csr(graph)
+        self.processes = processes or os.cpu_count() or 1
+        self.chunks_per_process = chunks_per_process
+
+    def map_sources(self, func, sources=None):
+        """
+        Apply func(graph, source) to every source node (all nodes by default).
+        func must be a module-level function so it can be pickled.
+        Returns:
+            dict: source -> func result.
+        """
+        sources = self.graph.get_nodes() if sources is None else list(sources)
+        if self.processes <= 1 or len(sources) <= 1:
+            return {s: func(self.graph, s) for s in sources}
+        n_chunks = min(len(sources), self.processes * self.chunks_per_process)
+        chunks = [sources[i::n_chunks] for i in range(n_chunks)]
+        result = {}
+        with Pool(self.processes, initializer=_init_worker, initargs=(self.graph,)) as pool:
+            for partial in pool.imap_unordered(_run_chunk, [(func, chunk) for chunk in chunks]):
+                result.update(partial)
+        return result
+
+    def map_chunks(self, func, sources=None):
+        """
+        Apply func(graph, chunk) to chunks of the source nodes (all nodes by default), e.g. to
+        compute partial sums that the caller reduces. func must be a module-level function.
+        Returns:
+            list: func results, in chunk order, so reductions over them are reproducible.
+        """
+        sources = self.graph.get_nodes() if sources is None else list(sources)
+        if self.processes <= 1 or len(sources) <= 1:
+            return [func(self.graph, sources)]
+        n_chunks = min(len(sources), self.processes * self.chunks_per_process)
+        chunks = [sources[i::n_chunks] for i in range(n_chunks)]
+        with Pool(self.processes, initializer=_init_worker, initargs=(self.graph,)) as pool:
+            return list(pool.imap(_run_whole_chunk, [(func, chunk) for chunk in chunks]))
+
+    def all_distances(self, sources=None):
+        """
+        Shortest distances from every source: source -> {target: distance}.
+        """
+        return self.map_sources(source_distances, sources)
+
+    def all_reachable(self, sources=None):
+        """
+        Nodes reachable from every source, in BFS order: source -> [nodes].
+        """
+        return self.map_sources(source_reachable, sources)
+
+
+_worker_graph = None
+
+
+def _init_worker(graph):
+    global _worker_graph
+    _worker_graph = graph
+
+
+def _run_chunk(task):
+    func, sources = task
+    return {s: func(_worker_graph, s) for s in sources}
+
+
+def _run_whole_chunk(task):
+    func, sources = task
+    return func(_worker_graph, sources)
+
+
+def source_distances(graph, source):
+    """
+    Per-source task for ParallelExecutor: shortest distances from source.
+    """
+    return graph.single_source_distances(source)[0]
+
+
+def source_reachable(graph, source):
+    """
+    Per-source task for ParallelExecutor: nodes reachable from source in BFS order.
+    """
+    return graph.reachable_bfs(source)
+
+
+def read_edge_chunks(path, sep="\t", chunk_size=100000):
+    """
+    Stream an edge-list file as lists of at most chunk_size (origin, dest, weight) tuples.
+    Blank lines and lines starting with '#' are skipped; a missing weight defaults to 1.
+    """
+    chunk = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = line.split(sep)
+            chunk.append((fields[0], fields[1], _parse_weight(fields[2]) if len(fields) > 2 else 1))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def _parse_weight(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
 def is_in_tuple_list(tl, val):
     """
     Helper function to check if a value is the first element of any tuple in a list.
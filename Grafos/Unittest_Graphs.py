@@ -1,6 +1,14 @@
 
+import os
+import tempfile
 import unittest
-from Grafos import MyGraph
+from array import array
+from Grafos import MyGraph, ParallelExecutor
+
+
+def chunk_reach(graph, sources):
+    return sum(len(graph.reachable_bfs(s)) for s in sources)
+
 
 class TestMyGraph(unittest.TestCase):
     def setUp(self):
@@ -27,6 +35,19 @@ class TestMyGraph(unittest.TestCase):
         self.assertEqual(set(self.g.get_predecessors(3)), {1, 2})
         self.assertEqual(set(self.g.get_adjacents(3)), {1, 2, 4})
 
+    def test_predecessors_after_add_edge(self):
+        self.g.add_edge(4, 3, 1)
+        self.g.add_edge(5, 3, 1)
+        self.assertEqual(set(self.g.get_predecessors(3)), {1, 2, 4, 5})
+        self.assertEqual(self.g.in_degree(3), 4)
+        self.assertEqual(self.g.get_predecessors(5), [])
+
+    def test_default_graphs_are_independent(self):
+        g1, g2 = MyGraph(), MyGraph()
+        g1.add_edge(1, 2, 1)
+        self.assertEqual(g2.get_nodes(), [])
+        self.assertEqual(g2.in_degree(2), 0)
+
     def test_degrees(self):
         self.assertEqual(self.g.out_degree(2), 2)
         self.assertEqual(self.g.in_degree(3), 2)
@@ -38,17 +59,144 @@ class TestMyGraph(unittest.TestCase):
         self.assertEqual(self.g.shortest_path(1, 1), [1])
         self.assertIsNone(self.g.shortest_path(4, 1))
 
+    def test_single_source_distances(self):
+        dist, prev = self.g.single_source_distances(1)
+        self.assertEqual(dist, {1: 0, 3: 1, 2: 3, 4: 3})
+        self.assertEqual(list(dist), [1, 3, 2, 4])
+        self.assertEqual(prev[4], 3)
+        self.assertIsNone(self.g.distance(4, 1))
+
+    def test_all_pairs_shortest_paths(self):
+        self.g.all_pairs_shortest_paths()
+        self.assertEqual(self.g.distance(1, 4), 3)
+        self.assertEqual(self.g.shortest_path(1, 4), [1, 3, 4])
+        self.assertIsNone(self.g.shortest_path(4, 1))
+        self.assertIsNone(self.g.distance(4, 1))
+        self.g.add_edge(1, 4, 1)
+        self.assertEqual(self.g.distance(1, 4), 1)
+        self.assertEqual(self.g.shortest_path(1, 4), [1, 4])
+
+    def test_all_pairs_unweighted(self):
+        g = MyGraph({1: [(2, 1)], 2: [(3, 1)], 3: [(1, 1)], 4: [(1, 1)]})
+        g.all_pairs_shortest_paths()
+        self.assertEqual(g.distance(4, 3), 3)
+        self.assertEqual(g.shortest_path(4, 3), [4, 1, 2, 3])
+        self.assertIsNone(g.distance(1, 4))
+
+    def test_landmark_shortest_path(self):
+        chosen = self.g.prepare_landmarks(k=2, seed=0)
+        self.assertEqual(len(chosen), 2)
+        self.assertEqual(self.g.shortest_path(1, 4), [1, 3, 4])
+        self.assertEqual(self.g.distance(2, 4), 5)
+        self.assertIsNone(self.g.shortest_path(4, 1))
+        self.g.add_edge(2, 4, 1)
+        self.assertEqual(self.g.distance(2, 4), 1)
+
     def test_reachability(self):
         self.assertEqual(set(self.g.reachable_bfs(1)), {2, 3, 4})
         self.assertEqual(set(self.g.reachable_dfs(1)), {2, 3, 4})
         dists = dict(self.g.reachable_with_dist(1))
         self.assertEqual(dists[4], 2)
 
+    def test_lazy_traversals(self):
+        self.assertEqual(self.g.reachable_bfs(1), [2, 3, 4])
+        self.assertEqual(self.g.reachable_dfs(1), [2, 3, 4])
+        self.assertEqual(self.g.reachable_with_dist(1), [(2, 1), (3, 1), (4, 2)])
+        self.assertEqual(next(self.g.iter_bfs(1)), 2)
+        g = MyGraph({1: [(1, 1), (2, 1)], 2: [(1, 1)]})
+        self.assertEqual(g.reachable_dfs(1), [2])
+        self.assertEqual(g.reachable_with_dist(1), [(2, 1)])
+
+    def test_memoized_queries(self):
+        version = self.g.version
+        edges = self.g.get_edges()
+        edges.append((9, 9, 9))
+        self.assertEqual(self.g.size(), (4, 5))
+        self.assertNotIn((9, 9, 9), self.g.get_edges())
+        self.assertEqual(self.g.in_degrees(), {1: 0, 2: 1, 3: 2, 4: 2})
+        self.assertEqual(self.g.reachable_bfs(3), [4])
+        self.g.add_edge(4, 5, 1)
+        self.assertGreater(self.g.version, version)
+        self.assertEqual(self.g.size(), (5, 6))
+        self.assertIn((4, 5, 1), self.g.get_edges())
+        self.assertEqual(self.g.in_degrees()[5], 1)
+        self.assertEqual(self.g.out_degrees()[4], 1)
+        self.assertEqual(self.g.reachable_bfs(3), [4, 5])
+        self.assertEqual(self.g.reachable_dfs(3), [4, 5])
+
     def test_cycles(self):
         self.assertFalse(self.g.has_cycle())
         self.g.add_edge(4, 1, 1)  
         self.assertTrue(self.g.has_cycle())
 
+    def test_freeze_csr(self):
+        csr = self.g.freeze()
+        self.assertEqual(csr.get_edges(), self.g.get_edges())
+        self.assertEqual(csr.size(), (4, 5))
+        self.assertEqual(set(csr.get_successors(1)), {2, 3})
+        self.assertEqual(set(csr.get_predecessors(3)), {1, 2})
+        self.assertEqual(csr.degree(3), 3)
+        self.assertEqual(csr.shortest_path(1, 4), [1, 3, 4])
+        self.assertEqual(list(csr.successor_ids(csr.ids[1])), [csr.ids[2], csr.ids[3]])
+        with self.assertRaises(TypeError):
+            csr.add_edge(4, 1, 1)
+
+    def test_strongly_connected_components(self):
+        g = MyGraph({1: [(2, 1)], 2: [(3, 1)], 3: [(1, 1), (4, 1)], 4: [(5, 1)], 5: [(4, 1)], 6: []})
+        components = {frozenset(c) for c in g.strongly_connected_components()}
+        self.assertEqual(components, {frozenset({1, 2, 3}), frozenset({4, 5}), frozenset({6})})
+        component, dag = g.condensation()
+        self.assertEqual(dag.size(), (3, 1))
+        self.assertIn((component[1], component[4], 1), dag.get_edges())
+        self.assertFalse(dag.has_cycle())
+
+    def test_has_cycle_deep_chain(self):
+        g = MyGraph()
+        for i in range(5000):
+            g.add_edge(i, i + 1, 1)
+        self.assertFalse(g.has_cycle())
+        g.add_edge(5000, 0, 1)
+        self.assertTrue(g.has_cycle())
+
+    def test_parallel_executor(self):
+        executor = ParallelExecutor(self.g, processes=2)
+        distances = executor.all_distances()
+        self.assertEqual(distances[1], {1: 0, 3: 1, 2: 3, 4: 3})
+        self.assertEqual(distances[4], {4: 0})
+        self.assertEqual(executor.all_reachable([1, 3]), {1: [2, 3, 4], 3: [4]})
+        self.assertEqual(sum(executor.map_chunks(chunk_reach)), 6)
+
+    def test_bulk_constructors(self):
+        g = MyGraph.from_edges([(1, 2, 3), (1, 3), (2, 3, 7), (2, 4, 5), (3, 4, 2)])
+        self.assertEqual(g.get_edges(), [(1, 2, 3), (1, 3, 1), (2, 3, 7), (2, 4, 5), (3, 4, 2)])
+        self.assertEqual(set(g.get_predecessors(3)), {1, 2})
+        g = MyGraph.from_arrays([0, 1], [1, 2], labels=["a", "b", "c"])
+        self.assertEqual(g.get_edges(), [("a", "b", 1), ("b", "c", 1)])
+        g = MyGraph.from_arrays(array('q', [0, 1]), array('q', [1, 2]), array('q', [4, 5]), array('q', [10, 20, 30]))
+        self.assertEqual(g.get_edges(), [(10, 20, 4), (20, 30, 5)])
+        self.assertTrue(all(type(v) is int for v in g.get_nodes()))
+        self.assertEqual(g.freeze().weights.typecode, 'q')
+
+    def test_file_io(self):
+        with tempfile.TemporaryDirectory() as folder:
+            tsv = os.path.join(folder, "edges.tsv")
+            self.g.to_tsv(tsv)
+            g = MyGraph.from_tsv(tsv, chunk_size=2)
+            self.assertEqual(g.get_edges(), [(str(o), str(d), w) for o, d, w in self.g.get_edges()])
+            binary = os.path.join(folder, "graph.bin")
+            self.g.save(binary)
+            self.assertEqual(MyGraph.load(binary).graph, self.g.graph)
+            self.assertEqual(MyGraph.load(binary, frozen=True).get_edges(), self.g.get_edges())
+            g = MyGraph.from_edges([("a", "b", 0.5), ("b", "c", 2.0)])
+            g.save(binary)
+            self.assertEqual(MyGraph.load(binary).get_edges(), g.get_edges())
+            with open(binary, "wb") as f:
+                f.write(b"not a graph file")
+            with self.assertRaises(ValueError):
+                MyGraph.load(binary)
+            with self.assertRaises(ValueError):
+                MyGraph({(1, 2): []}).save(binary)
+
     def test_empty_graph(self):
         g = MyGraph({})
         self.assertEqual(g.get_nodes(), [])
@@ -0,0 +1,78 @@
+from array import array
+from Graphs import as_csr, memoized
+
+
+DEGREE_TYPES = ("in", "out", "inout")
+
+
+def degree_vectors(graph):
+    """
+    In, out and inout degrees of every node, computed in one pass over the CSR edge arrays
+    of the graph (see as_csr) and memoized until the graph changes.
+    The inout degree of a node is its out-degree plus its in-edges with no reciprocal edge,
+    so a pair of opposite edges counts once.
+    Returns:
+        dict: Degree type to an array of degrees indexed by CSR node id.
+    """
+    return memoized(graph, "degree_vectors", _degree_vectors, graph)
+
+
+def _degree_vectors(graph):
+    csr = as_csr(graph)
+    n = len(csr.labels)
+    offsets, targets = csr.offsets, csr.targets
+    out_deg = array('q', [offsets[i + 1] - offsets[i] for i in range(n)])
+    in_deg = array('q', bytes(8 * n))
+    inout_deg = array('q', out_deg)
+    edges = set()
+    for i in range(n):
+        for k in range(offsets[i], offsets[i + 1]):
+            t = targets[k]
+            in_deg[t] += 1
+            edges.add(i * n + t)
+    for i in range(n):
+        for k in range(offsets[i], offsets[i + 1]):
+            t = targets[k]
+            if t * n + i not in edges:
+                inout_deg[t] += 1
+    return {"in": in_deg, "out": out_deg, "inout": inout_deg}
+
+
+def degree_vector(graph, deg_type="inout"):
+    """
+    Degrees of one type ('in', 'out' or 'inout') indexed by CSR node id.
+    """
+    if deg_type not in DEGREE_TYPES:
+        raise ValueError(f"Unknown degree type: {deg_type}")
+    return degree_vectors(graph)[deg_type]
+
+
+def degree_histogram(graph, deg_type="inout"):
+    """
+    Number of nodes with each degree, by counting sort over the degree vector.
+    Returns:
+        dict: Degree value to node count, by increasing degree.
+    """
+    return memoized(graph, ("degree_histogram", deg_type), _degree_histogram, graph, deg_type)
+
+
+def _degree_histogram(graph, deg_type):
+    degrees = degree_vector(graph, deg_type)
+    counts = array('q', bytes(8 * (max(degrees, default=0) + 1)))
+    for d in degrees:
+        counts[d] += 1
+    return {d: c for d, c in enumerate(counts) if c}
+
+
+def degree_distribution(graph, deg_type="inout"):
+    """
+    The degree histogram as probabilities.
+    Returns:
+        dict: Degree value to probability.
+    """
+    return memoized(graph, ("degree_distribution", deg_type), _degree_distribution, graph, deg_type)
+
+
+def _degree_distribution(graph, deg_type):
+    n = len(degree_vector(graph, deg_type))
+    return {d: c / n for d, c in degree_histogram(graph, deg_type).items()}
@@ -1,6 +1,9 @@
-from Graphs import MyGraph
+from Graphs import MyGraph, ParallelExecutor, as_csr, memoized
+from Degree_Statistics import degree_vector, degree_distribution
 import re
 import heapq
+import math
+import random
 from collections import deque
 
 
@@ -9,25 +12,15 @@ class MN_Graph(MyGraph):
     Specialized graph class for metabolite networks, extending Graph with methods 
     for analyzing node degrees, centrality, and clustering.
     """
-    def __init__(self, g = {}):
+    def __init__(self, g = None):
         super().__init__(g)
 
     def all_degrees(self, deg_type="inout"):
         """
-        Return node degrees based on direction: 'in', 'out', or both.
-        """
-        degs = {}
-        for v in self.graph:
-            if deg_type in ("out", "inout"):
-                degs[v] = len(self.graph[v])
-            else:
-                degs[v] = 0
-        if deg_type in ("in", "inout"):
-            for v in self.graph:
-                for d in self.graph[v]:
-                    if deg_type == "in" or v not in self.graph.get(d, []):
-                        degs[d] = degs.get(d, 0) + 1
-        return degs
+        Return node degrees based on direction: 'in', 'out', or both ('inout', where
+        a pair of opposite edges counts once).
+        """
+        return dict(zip(self.freeze().labels, degree_vector(self, deg_type)))
 
     def highest_degrees(self, all_deg=None, deg_type="inout", top=10):
         """
@@ -45,8 +38,8 @@ class MN_Graph(MyGraph):
         """
         Calculate average degree of all nodes.
         """
-        degs = self.all_degrees(deg_type)
-        return sum(degs.values()) / len(degs)
+        degs = degree_vector(self, deg_type)
+        return sum(degs) / len(degs)
 
     def prob_degree(self, deg_type="inout"):
         """
@@ -57,11 +50,7 @@ class MN_Graph(MyGraph):
         Returns:
             dict: Degree value to probability.
         """
-        degs = self.all_degrees(deg_type)
-        hist = {}
-        for d in degs.values():
-            hist[d] = hist.get(d, 0) + 1
-        return {k: v / len(degs) for k, v in hist.items()}
+        return dict(degree_distribution(self, deg_type))
 
     def mean_distances(self):
         """
@@ -70,9 +59,9 @@ class MN_Graph(MyGraph):
         total_dist = 0
         count = 0
         for node in self.get_nodes():
-            for _, dist in self.reachable_with_dist(node):
+            for _, dist in self.iter_with_dist(node):
                 total_dist += dist
-            count += len(self.reachable_with_dist(node))
+                count += 1
         mean_dist = total_dist / count if count else 0
         n = len(self.get_nodes())
         density = count / (n * (n - 1)) if n > 1 else 0
@@ -94,21 +83,108 @@ class MN_Graph(MyGraph):
         centrality = {n: self.closeness_centrality(n) for n in self.get_nodes()}
         return sorted(centrality, key=centrality.get, reverse=True)[:top]
 
-    def betweenness_centrality(self, node):
+    def betweenness_centrality(self, node, weighted=True):
+        """
+        Betweenness centrality for a node: the fraction of connected (s, t) pairs, s and t
+        other than the node, whose shortest paths go through it (see all_betweenness;
+        edge weights by default, hop counts if weighted is False).
+        """
+        return self.all_betweenness(weighted).get(node, 0.0)
+
+    def all_betweenness(self, weighted=True, normalization="reachable"):
         """
-        Approximate betweenness centrality for a node.
+        Betweenness of every node in a single Brandes pass (one Dijkstra per source, or one
+        BFS on the CentralityEngine if not weighted), memoized until the graph changes.
+        Parameters:
+            weighted (bool): Use edge weights; False counts hops, like CentralityAnalyzer.
+            normalization (str): "reachable" divides by the number of connected (s, t) pairs
+                not involving the node, "pairs" by (n - 1)(n - 2), None keeps the raw sums.
+        Returns:
+            dict: Node to betweenness.
+        """
+        if normalization not in ("reachable", "pairs", None):
+            raise ValueError(f"Unknown normalization: {normalization}")
+        return self.memoize(("betweenness", weighted, normalization), self._brandes, weighted, normalization)
+
+    def _brandes(self, weighted, normalization):
+        if weighted:
+            centrality, reach, reached_by = self._weighted_dependencies()
+        else:
+            engine = CentralityEngine.for_graph(self)
+            n = len(engine.labels)
+            raw, reached = [0.0] * n, [0] * n
+            counts = [engine.accumulate_betweenness(i, raw, reached) for i in range(n)]
+            centrality = dict(zip(engine.labels, raw))
+            reach = dict(zip(engine.labels, counts))
+            reached_by = dict(zip(engine.labels, reached))
+        connected = sum(reach.values())
+        if normalization == "reachable":
+            for v in centrality:
+                total = connected - reach[v] - reached_by[v]
+                centrality[v] = centrality[v] / total if total > 0 else 0.0
+        elif normalization == "pairs":
+            n = len(centrality)
+            scale = 1 / ((n - 1) * (n - 2)) if n > 2 else 0.0
+            for v in centrality:
+                centrality[v] *= scale
+        return centrality
+
+    def _weighted_dependencies(self):
         """
-        total = 0
-        through = 0
-        for s in self.get_nodes():
-            for t in self.get_nodes():
-                if s != t and s != node and t != node:
-                    path = self.shortest_path(s, t)
-                    if path:
-                        total += 1
-                        if node in path:
-                            through += 1
-        return through / total if total > 0 else 0
+        Brandes pass with one Dijkstra per source.
+        Returns:
+            tuple: (centrality, reach, reached_by) dicts - raw pair-dependency sums, number of
+            nodes reachable from each node and number of sources reaching each node.
+        """
+        centrality = dict.fromkeys(self.graph, 0.0)
+        reach = dict.fromkeys(self.graph, 0)
+        reached_by = dict.fromkeys(self.graph, 0)
+        for s in self.graph:
+            order, pred, sigma = self._weighted_shortest_path_dag(s)
+            delta = dict.fromkeys(order, 0.0)
+            for w in reversed(order):
+                for v in pred[w]:
+                    delta[v] += sigma[v] / sigma[w] * (1 + delta[w])
+                if w != s:
+                    centrality[w] += delta[w]
+                    reached_by[w] += 1
+            reach[s] = len(order) - 1
+        return centrality, reach, reached_by
+
+    def _weighted_shortest_path_dag(self, s):
+        """
+        Shortest-path DAG from s over edge weights, for Brandes' algorithm.
+        Returns:
+            tuple: (order, pred, sigma) - reachable nodes by non-decreasing distance, their
+            predecessors on shortest paths and their number of shortest paths from s.
+        """
+        order = []
+        pred = {s: []}
+        sigma = {s: 1}
+        dist = {}
+        best = {s: 0}
+        heap = [(0, 0, s)]
+        counter = 1
+        while heap:
+            d, _, v = heapq.heappop(heap)
+            if v in dist:
+                continue
+            dist[v] = d
+            order.append(v)
+            for w, weight in self.graph[v]:
+                if w in dist:
+                    continue
+                new_dist = d + weight
+                if w not in best or new_dist < best[w]:
+                    best[w] = new_dist
+                    pred[w] = [v]
+                    sigma[w] = sigma[v]
+                    heapq.heappush(heap, (new_dist, counter, w))
+                    counter += 1
+                elif new_dist == best[w]:
+                    pred[w].append(v)
+                    sigma[w] += sigma[v]
+        return order, pred, sigma
 
     def clustering_coef(self, v):
         """
@@ -141,85 +217,157 @@ class MN_Graph(MyGraph):
         """
         Average clustering coefficient grouped by degree.
         """
-        degs = self.all_degrees(deg_type)
+        degs = degree_vector(self, deg_type)
         ccs = self.all_clustering_coefs()
         grouped = {}
-        for node, deg in degs.items():
+        for node, deg in zip(self.freeze().labels, degs):
             grouped.setdefault(deg, []).append(ccs[node])
         return {k: sum(v) / len(v) for k, v in grouped.items()}
 
 
 class CentralityAnalyzer:
     """
-    Centrality calculator using various metrics.
+    Centrality calculator using various metrics, for a MyGraph or any graph with
+    get_nodes() and get_successors(v).
+    With processes other than 1, closeness and betweenness shard the source nodes over a
+    process pool sharing a CSR snapshot of the graph (None uses every core).
     """
 
-    def __init__(self, graph):
+    def __init__(self, graph, processes=1):
         self.graph = graph
+        self.processes = processes
+
+    def _partials(self, func):
+        """
+        Run func(graph, sources) over all source nodes, serially or in chunks over the pool.
+        """
+        if self.processes == 1:
+            return [func(self.graph, self.graph.get_nodes())]
+        return ParallelExecutor(self.graph, self.processes).map_chunks(func)
 
     def degree_centrality(self):
         """
         Return degree centrality of each node.
         """
-        return {n: len(self.graph.get_successors(n)) for n in self.graph.get_nodes()}
+        engine = CentralityEngine.for_graph(self.graph)
+        return dict(zip(engine.labels, engine.out_degrees()))
 
     def closeness_centrality(self):
         """
         Return closeness centrality for all nodes.
         """
         result = {}
-        for node in self.graph.get_nodes():
-            dist, count = self._bfs_total_distance_and_reach_count(node)
-            result[node] = (count / dist) if dist > 0 else 0.0
-        return result
-
-    def _bfs_total_distance_and_reach_count(self, start):
-        """
-        Breadth-first traversal for closeness computation.
-        """
-        visited = set()
-        queue = deque([(start, 0)])
-        total, count = 0, 0
-        while queue:
-            node, dist = queue.popleft()
-            if node not in visited:
-                visited.add(node)
-                if node != start:
-                    total += dist
-                    count += 1
-                queue.extend((n, dist + 1) for n in self.graph.get_successors(node) if n not in visited)
-        return total, count
+        for partial in self._partials(closeness_chunk):
+            result.update(partial)
+        return {node: result[node] for node in self.graph.get_nodes()}
 
     def betweenness_centrality(self):
         """
         Compute node betweenness using Brandes' algorithm.
         """
-        centrality = dict.fromkeys(self.graph.get_nodes(), 0.0)
-        for s in self.graph.get_nodes():
-            stack = []
-            pred = {w: [] for w in self.graph.get_nodes()}
-            sigma = dict.fromkeys(self.graph.get_nodes(), 0)
-            dist = dict.fromkeys(self.graph.get_nodes(), -1)
-            sigma[s], dist[s] = 1, 0
-            queue = deque([s])
-            while queue:
-                v = queue.popleft()
-                stack.append(v)
-                for w in self.graph.get_successors(v):
-                    if dist[w] < 0:
-                        dist[w] = dist[v] + 1
-                        queue.append(w)
-                    if dist[w] == dist[v] + 1:
-                        sigma[w] += sigma[v]
-                        pred[w].append(v)
-            delta = dict.fromkeys(self.graph.get_nodes(), 0)
-            while stack:
-                w = stack.pop()
-                for v in pred[w]:
-                    delta[v] += (sigma[v] / sigma[w]) * (1 + delta[w])
-                if w != s:
-                    centrality[w] += delta[w]
-        return centrality
+        partials = self._partials(betweenness_chunk)
+        centrality = partials[0]
+        for partial in partials[1:]:
+            for i, value in enumerate(partial):
+                centrality[i] += value
+        return dict(zip(CentralityEngine.for_graph(self.graph).labels, centrality))
+
+    def approximate_betweenness(self, epsilon=0.05, delta=0.1, seed=None):
+        """
+        Estimate betweenness by Riondato-Kornaropoulos sampling: draw r random (s, t) pairs,
+        pick one of their shortest paths uniformly and credit its inner nodes. r grows with
+        1 / epsilon^2 and the log of the vertex diameter, not with the graph size; when r
+        would reach the number of nodes, the exact betweenness is cheaper and is returned
+        with zero-width intervals.
+        Parameters:
+            epsilon (float): Error bound, as a fraction of the n(n - 1) ordered pairs.
+            delta (float): Probability that some estimate misses the bound.
+            seed (int): Seed for the random sampler.
+        Returns:
+            tuple: (estimates, intervals) - node to estimate on the betweenness_centrality
+            scale, and node to (low, high), all holding together with probability 1 - delta.
+        """
+        engine = CentralityEngine.for_graph(self.graph)
+        n = len(engine.labels)
+        if n < 3:
+            return dict.fromkeys(engine.labels, 0.0), {v: (0.0, 0.0) for v in engine.labels}
+        diameter = self._vertex_diameter_bound(engine)
+        samples = math.ceil(0.5 / epsilon ** 2
+                            * (math.floor(math.log2(max(diameter - 2, 1))) + 1 + math.log(1 / delta)))
+        if samples >= n:
+            exact = self.betweenness_centrality()
+            return exact, {v: (b, b) for v, b in exact.items()}
+        rng = random.Random(seed)
+        scale = n * (n - 1) / samples
+        estimates = [0.0] * n
+        for _ in range(samples):
+            s, t = rng.sample(range(n), 2)
+            for v in engine.sample_shortest_path(s, t, rng):
+                estimates[v] += scale
+        error = epsilon * n * (n - 1)
+        return (dict(zip(engine.labels, estimates)),
+                {v: (max(b - error, 0.0), b + error) for v, b in zip(engine.labels, estimates)})
+
+    @staticmethod
+    def _vertex_diameter_bound(engine):
+        """
+        Upper bound on the number of nodes in a shortest path. In a strongly connected graph
+        this is the forward plus backward eccentricity of the highest out-degree node, plus
+        one; otherwise the number of nodes, the only bound that holds for every component.
+        """
+        n = len(engine.labels)
+        hub = max(range(n), key=lambda v: len(engine.adjacency[v]))
+        bound = 1
+        for reverse in (False, True):
+            tail = engine.bfs(hub, reverse)
+            eccentricity = engine.dist[engine.order[tail - 1]]
+            engine.reset(tail)
+            if tail < n:
+                return n
+            bound += eccentricity
+        return min(n, bound)
+
+    def approximate_closeness(self, epsilon=0.1, delta=0.1, seed=None):
+        """
+        Estimate closeness by pivot sampling (Eppstein-Wang): one reverse BFS from each of
+        k random pivots gives every node its distance to them, and the mean over the pivots
+        a node reaches estimates its mean distance. k grows with log(n) / epsilon^2; when it
+        reaches n, the exact closeness is returned with zero-width intervals.
+        Parameters:
+            epsilon (float): Error bound on the mean distance, as a fraction of the diameter.
+            delta (float): Probability that some interval misses its value (Hoeffding bound).
+            seed (int): Seed for the pivot choice.
+        Returns:
+            tuple: (estimates, intervals) - node to closeness estimate and node to (low, high).
+        """
+        engine = CentralityEngine.for_graph(self.graph)
+        n = len(engine.labels)
+        k = math.ceil(math.log(2 * max(n, 1) / delta) / (2 * epsilon ** 2))
+        if k >= n:
+            exact = self.closeness_centrality()
+            return exact, {v: (c, c) for v, c in exact.items()}
+        dist, order = engine.dist, engine.order
+        total = [0] * n
+        hits = [0] * n
+        diameter = 1
+        for p in random.Random(seed).sample(range(n), k):
+            tail = engine.bfs(p, reverse=True)
+            for i in range(1, tail):
+                v = order[i]
+                total[v] += dist[v]
+                hits[v] += 1
+            diameter = max(diameter, dist[order[tail - 1]])
+            engine.reset(tail)
+        estimates, intervals = {}, {}
+        for v, label in enumerate(engine.labels):
+            if hits[v] == 0:
+                estimates[label], intervals[label] = 0.0, (0.0, 0.0)
+                continue
+            mean = total[v] / hits[v]
+            half = diameter * math.sqrt(math.log(2 * n / delta) / (2 * hits[v]))
+            estimates[label] = 1 / mean
+            intervals[label] = (1 / (mean + half), 1 / max(mean - half, 1))
+        return estimates, intervals
 
     def top_nodes(self, centrality_dict, top_n=5):
         """
@@ -228,6 +376,213 @@ class CentralityAnalyzer:
         return heapq.nlargest(top_n, centrality_dict.items(), key=lambda x: x[1])
 
 
+class CentralityEngine:
+    """
+    Integer-indexed BFS and Brandes kernels over the CSR adjacency of a graph (see as_csr),
+    so any object with get_nodes() and get_successors(v) can be analysed.
+    The per-node arrays (distance, path count, dependency, BFS order) are allocated once
+    and, after each source, reset only at the entries that search touched.
+    """
+
+    def __init__(self, graph):
+        csr = as_csr(graph)
+        self.labels = csr.labels
+        self.ids = csr.ids
+        offsets, targets = csr.offsets, csr.targets
+        n = len(self.labels)
+        self.adjacency = [tuple(targets[offsets[i]:offsets[i + 1]]) for i in range(n)]
+        self.dist = [-1] * n
+        self.sigma = [0] * n
+        self.delta = [0.0] * n
+        self.order = [0] * n
+        self._reverse = None                      # predecessor tuples, built on first use
+
+    @classmethod
+    def for_graph(cls, graph):
+        """
+        The engine of a graph, built once and shared until the graph changes
+        (rebuilt on every call for graphs without MyGraph.memoize).
+        """
+        return memoized(graph, "centrality_engine", cls, graph)
+
+    def out_degrees(self):
+        """
+        Out-degree of every node id.
+        """
+        return [len(successors) for successors in self.adjacency]
+
+    def closeness(self, s):
+        """
+        Closeness of node id s: nodes reached over the sum of their BFS distances.
+        """
+        adjacency, dist, order = self.adjacency, self.dist, self.order
+        dist[s] = 0
+        order[0] = s
+        head, tail, total = 0, 1, 0
+        while head < tail:
+            v = order[head]
+            head += 1
+            dv = dist[v] + 1
+            for w in adjacency[v]:
+                if dist[w] < 0:
+                    dist[w] = dv
+                    total += dv
+                    order[tail] = w
+                    tail += 1
+        for i in range(tail):
+            dist[order[i]] = -1
+        return (tail - 1) / total if total > 0 else 0.0
+
+    def accumulate_betweenness(self, s, centrality, reached_by=None):
+        """
+        Add the Brandes dependencies of source id s to centrality (a list indexed by node id).
+        If reached_by is given, also add one to its entry for every node reached from s.
+        Returns:
+            int: Number of nodes reached from s (excluding s).
+        """
+        adjacency, dist, sigma, delta, order = self.adjacency, self.dist, self.sigma, self.delta, self.order
+        dist[s] = 0
+        sigma[s] = 1
+        order[0] = s
+        head, tail = 0, 1
+        while head < tail:
+            v = order[head]
+            head += 1
+            dv, sv = dist[v] + 1, sigma[v]
+            for w in adjacency[v]:
+                if dist[w] < 0:
+                    dist[w] = dv
+                    order[tail] = w
+                    tail += 1
+                if dist[w] == dv:
+                    sigma[w] += sv
+        for i in range(tail - 1, 0, -1):          # successors on shortest paths come later in BFS order
+            v = order[i]
+            dv, coeff = dist[v] + 1, 0.0
+            for w in adjacency[v]:
+                if dist[w] == dv:
+                    coeff += (1 + delta[w]) / sigma[w]
+            delta[v] = sigma[v] * coeff
+            centrality[v] += delta[v]
+            if reached_by is not None:
+                reached_by[v] += 1
+        for i in range(tail):
+            v = order[i]
+            dist[v] = -1
+            sigma[v] = 0
+            delta[v] = 0.0
+        return tail - 1
+
+    def reverse_adjacency(self):
+        """
+        Predecessor ids of every node id, as tuples.
+        """
+        if self._reverse is None:
+            predecessors = [[] for _ in self.adjacency]
+            for v, successors in enumerate(self.adjacency):
+                for w in successors:
+                    predecessors[w].append(v)
+            self._reverse = [tuple(p) for p in predecessors]
+        return self._reverse
+
+    def bfs(self, s, reverse=False):
+        """
+        BFS from node id s over successors (predecessors if reverse). Leaves the distances
+        in dist and the reached ids in BFS order in order[:tail]; call reset(tail) afterwards.
+        Returns:
+            int: tail, the number of nodes reached (including s).
+        """
+        adjacency = self.reverse_adjacency() if reverse else self.adjacency
+        dist, order = self.dist, self.order
+        dist[s] = 0
+        order[0] = s
+        head, tail = 0, 1
+        while head < tail:
+            v = order[head]
+            head += 1
+            dv = dist[v] + 1
+            for w in adjacency[v]:
+                if dist[w] < 0:
+                    dist[w] = dv
+                    order[tail] = w
+                    tail += 1
+        return tail
+
+    def reset(self, tail):
+        """
+        Clear the distances and path counts of the nodes in order[:tail].
+        """
+        dist, sigma, order = self.dist, self.sigma, self.order
+        for i in range(tail):
+            v = order[i]
+            dist[v] = -1
+            sigma[v] = 0
+
+    def sample_shortest_path(self, s, t, rng):
+        """
+        Inner node ids of a shortest s-t path chosen uniformly at random (empty if t is
+        unreachable). The BFS stops at the layer of t; the path is drawn backwards from t,
+        picking each predecessor with probability proportional to its path count.
+        """
+        adjacency, dist, sigma, order = self.adjacency, self.dist, self.sigma, self.order
+        dist[s] = 0
+        sigma[s] = 1
+        order[0] = s
+        head, tail = 0, 1
+        while head < tail:
+            v = order[head]
+            head += 1
+            if 0 <= dist[t] <= dist[v]:
+                break
+            dv, sv = dist[v] + 1, sigma[v]
+            for w in adjacency[v]:
+                if dist[w] < 0:
+                    dist[w] = dv
+                    order[tail] = w
+                    tail += 1
+                if dist[w] == dv:
+                    sigma[w] += sv
+        path = []
+        if dist[t] >= 0:
+            reverse = self.reverse_adjacency()
+            w = t
+            while True:
+                dv = dist[w] - 1
+                pick = rng.random() * sigma[w]
+                for v in reverse[w]:
+                    if dist[v] == dv:
+                        chosen = v
+                        pick -= sigma[v]
+                        if pick < 0:
+                            break
+                if chosen == s:
+                    break
+                path.append(chosen)
+                w = chosen
+        self.reset(tail)
+        return path
+
+
+def closeness_chunk(graph, sources):
+    """
+    Process-pool task: closeness centrality of each source node.
+    """
+    engine = CentralityEngine.for_graph(graph)
+    return {s: engine.closeness(engine.ids[s]) for s in sources}
+
+
+def betweenness_chunk(graph, sources):
+    """
+    Process-pool task: betweenness dependencies accumulated over the source nodes,
+    as a list indexed by CSR node id.
+    """
+    engine = CentralityEngine.for_graph(graph)
+    centrality = [0.0] * len(engine.labels)
+    for s in sources:
+        engine.accumulate_betweenness(engine.ids[s], centrality)
+    return centrality
+
+
 def parse_reactions(file_path):
     """
     Parse reaction data into structured reaction dictionaries.
@@ -289,33 +644,34 @@ def compute_final_metabolites(initial_metabolites, reactions):
         known.update(new)
     return known
 
-reactions_file = "ecoli.txt"
+if __name__ == "__main__":
+    reactions_file = "ecoli.txt"
 
-parsed_reactions = parse_reactions(reactions_file)
-print(f"Number of reactions parsed: {len(parsed_reactions)}")
+    parsed_reactions = parse_reactions(reactions_file)
+    print(f"Number of reactions parsed: {len(parsed_reactions)}")
 
-metabolite_graph = build_metabolite_graph(parsed_reactions)
+    metabolite_graph = build_metabolite_graph(parsed_reactions)
 
-centrality_analyzer = CentralityAnalyzer(metabolite_graph)
+    centrality_analyzer = CentralityAnalyzer(metabolite_graph)
 
-print("\nDegree Centrality:")
-for metabolite, degree_val in centrality_analyzer.top_nodes(centrality_analyzer.degree_centrality()):
-    print(f"{metabolite}: {degree_val}")
+    print("\nDegree Centrality:")
+    for metabolite, degree_val in centrality_analyzer.top_nodes(centrality_analyzer.degree_centrality()):
+        print(f"{metabolite}: {degree_val}")
 
-print("\nCloseness Centrality:")
-for metabolite, closeness_val in centrality_analyzer.top_nodes(centrality_analyzer.closeness_centrality()):
-    print(f"{metabolite}: {closeness_val:.4f}")
+    print("\nCloseness Centrality:")
+    for metabolite, closeness_val in centrality_analyzer.top_nodes(centrality_analyzer.closeness_centrality()):
+        print(f"{metabolite}: {closeness_val:.4f}")
 
-print("\nBetweenness Centrality:")
-for metabolite, betweenness_val in centrality_analyzer.top_nodes(centrality_analyzer.betweenness_centrality()):
-    print(f"{metabolite}: {betweenness_val:.4f}")
+    print("\nBetweenness Centrality:")
+    for metabolite, betweenness_val in centrality_analyzer.top_nodes(centrality_analyzer.betweenness_centrality()):
+        print(f"{metabolite}: {betweenness_val:.4f}")
 
-initial_metabolites = ["M_glc_DASH_D_c", "M_h2o_c", "M_nad_c", "M_atp_c"]
+    initial_metabolites = ["M_glc_DASH_D_c", "M_h2o_c", "M_nad_c", "M_atp_c"]
 
-reachable_metabolites = compute_final_metabolites(initial_metabolites, parsed_reactions)
+    reachable_metabolites = compute_final_metabolites(initial_metabolites, parsed_reactions)
 
-print("\nInitial Metabolites:")
-print(initial_metabolites)
+    print("\nInitial Metabolites:")
+    print(initial_metabolites)
 
-print("\nReachable Metabolites After Propagation:")
-print(sorted(reachable_metabolites))
\ No newline at end of file
+    print("\nReachable Metabolites After Propagation:")
+    print(sorted(reachable_metabolites))
\ No newline at end of file
@@ -0,0 +1,154 @@
+
+import unittest
+from Metabolic_Networks import MN_Graph, CentralityAnalyzer
+
+
+class TestMNGraph(unittest.TestCase):
+    def setUp(self):
+        self.g = MN_Graph({
+            1: [(2, 1), (3, 1)],
+            2: [(1, 1), (3, 1)],
+            3: [(4, 1)],
+            4: []
+        })
+
+    def test_all_degrees(self):
+        self.assertEqual(self.g.all_degrees("out"), {1: 2, 2: 2, 3: 1, 4: 0})
+        self.assertEqual(self.g.all_degrees("in"), {1: 1, 2: 1, 3: 2, 4: 1})
+        self.assertEqual(self.g.all_degrees("inout"), {1: 2, 2: 2, 3: 3, 4: 1})
+        self.assertEqual(self.g.mean_degree("inout"), 2)
+        self.assertEqual(self.g.highest_degrees(deg_type="inout", top=1), [3])
+        with self.assertRaises(ValueError):
+            self.g.all_degrees("both")
+
+    def test_prob_degree(self):
+        self.assertEqual(self.g.prob_degree("out"), {0: 0.25, 1: 0.25, 2: 0.5})
+        self.assertEqual(self.g.prob_degree("in"), {1: 0.75, 2: 0.25})
+        self.assertEqual(self.g.prob_degree("inout"), {1: 0.25, 2: 0.5, 3: 0.25})
+
+    def test_mean_clustering_perdegree(self):
+        self.assertEqual(self.g.mean_clustering_perdegree("out"), {2: 1.0, 1: 1 / 3, 0: 0.0})
+        self.assertEqual(self.g.mean_clustering_perdegree("in"), {1: 2 / 3, 2: 1 / 3})
+        self.assertEqual(self.g.mean_clustering_perdegree("inout"), {2: 1.0, 3: 1 / 3, 1: 0.0})
+
+    def test_degree_memos_after_add_edge(self):
+        self.g.prob_degree("in")
+        self.g.add_edge(4, 3, 1)
+        self.assertEqual(self.g.all_degrees("out")[4], 1)
+        self.assertEqual(self.g.all_degrees("in")[3], 3)
+        self.assertEqual(self.g.all_degrees("inout"), {1: 2, 2: 2, 3: 3, 4: 1})
+        self.assertEqual(self.g.prob_degree("in"), {1: 0.75, 3: 0.25})
+        self.g.add_edge(5, 1, 1)
+        self.assertEqual(self.g.all_degrees("inout")[5], 1)
+        self.assertEqual(self.g.mean_clustering_perdegree("out")[1], 1 / 9)
+
+    def test_all_betweenness(self):
+        g = MN_Graph({1: [(2, 1), (3, 1)], 2: [(4, 1)], 3: [(4, 5)], 4: []})
+        self.assertEqual(g.all_betweenness(weighted=False, normalization=None), {1: 0.0, 2: 0.5, 3: 0.5, 4: 0.0})
+        self.assertEqual(g.all_betweenness(weighted=False), {1: 0.0, 2: 0.5 / 3, 3: 0.5 / 3, 4: 0.0})
+        self.assertEqual(g.all_betweenness(weighted=False, normalization="pairs"), {1: 0.0, 2: 0.5 / 6, 3: 0.5 / 6, 4: 0.0})
+        self.assertEqual(g.all_betweenness(), {1: 0.0, 2: 1 / 3, 3: 0.0, 4: 0.0})
+        self.assertEqual(g.betweenness_centrality(2), 1 / 3)
+        self.assertEqual(g.betweenness_centrality(2), g.all_betweenness()[2])
+        self.assertEqual(g.betweenness_centrality(2, weighted=False), g.all_betweenness(weighted=False)[2])
+        self.assertIs(g.all_betweenness(), g.all_betweenness())
+        with self.assertRaises(ValueError):
+            g.all_betweenness(normalization="total")
+        g.add_edge(1, 4, 1)
+        self.assertEqual(g.all_betweenness(weighted=False, normalization=None), {1: 0.0, 2: 0.0, 3: 0.0, 4: 0.0})
+
+
+class AdjacencyGraph:
+    """
+    Minimal graph with only get_nodes and get_successors, as CentralityAnalyzer documents.
+    """
+
+    def __init__(self, adjacency):
+        self.adjacency = adjacency
+
+    def get_nodes(self):
+        return list(self.adjacency)
+
+    def get_successors(self, v):
+        return list(self.adjacency[v])
+
+
+class TestCentralityAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self.g = MN_Graph({
+            1: [(2, 1), (3, 1)],
+            2: [(3, 1), (4, 1)],
+            3: [(4, 1), (5, 1)],
+            4: [(6, 1)],
+            5: [(6, 1), (1, 1)],
+            6: [(7, 1)],
+            7: [(8, 1), (1, 1)],
+            8: [(2, 1)]
+        })
+        self.analyzer = CentralityAnalyzer(self.g)
+
+    def test_duck_typed_graph(self):
+        duck = CentralityAnalyzer(AdjacencyGraph({v: self.g.get_successors(v) for v in self.g.get_nodes()}))
+        self.assertEqual(duck.degree_centrality(), self.analyzer.degree_centrality())
+        self.assertEqual(duck.closeness_centrality(), self.analyzer.closeness_centrality())
+        self.assertEqual(duck.betweenness_centrality(), self.analyzer.betweenness_centrality())
+
+    def test_parallel_matches_serial(self):
+        parallel = CentralityAnalyzer(self.g, processes=2)
+        for name in ("closeness_centrality", "betweenness_centrality"):
+            serial_values = getattr(self.analyzer, name)()
+            parallel_values = getattr(parallel, name)()
+            self.assertEqual(list(parallel_values), list(serial_values))
+            for v, value in serial_values.items():
+                self.assertAlmostEqual(parallel_values[v], value)
+            self.assertEqual(getattr(parallel, name)(), parallel_values)
+
+    def test_approximate_betweenness(self):
+        exact = self.analyzer.betweenness_centrality()
+        estimates, intervals = self.analyzer.approximate_betweenness(epsilon=0.1, seed=0)   # samples >= n: exact
+        self.assertEqual(estimates, exact)
+        self.assertEqual(intervals, {v: (b, b) for v, b in exact.items()})
+
+    def test_approximate_closeness(self):
+        exact = self.analyzer.closeness_centrality()
+        for seed in range(3):
+            estimates, intervals = self.analyzer.approximate_closeness(epsilon=0.9, seed=seed)
+            for v, value in exact.items():
+                self.assertLessEqual(intervals[v][0], value)
+                self.assertGreaterEqual(intervals[v][1], value)
+        estimates, intervals = self.analyzer.approximate_closeness(epsilon=0.1, seed=0)   # k == n: exact
+        for v, value in exact.items():
+            self.assertAlmostEqual(estimates[v], value)
+            self.assertEqual(intervals[v][0], intervals[v][1])
+
+    def test_approximate_sampling(self):
+        g = MN_Graph({i: [((i + 1) % 60, 1), ((i * 7 + 3) % 60, 1)] for i in range(60)})
+        g.add_edge(60, 0, 1)                                 # not strongly connected: safe diameter bound
+        analyzer = CentralityAnalyzer(g)
+        exact = analyzer.betweenness_centrality()
+        estimates, intervals = analyzer.approximate_betweenness(epsilon=0.5, seed=0)
+        self.assertNotEqual(estimates, exact)
+        for v, value in exact.items():
+            self.assertLessEqual(intervals[v][0], value)
+            self.assertGreaterEqual(intervals[v][1], value)
+        self.assertEqual(analyzer.approximate_betweenness(epsilon=0.5, seed=0), (estimates, intervals))
+        exact = analyzer.closeness_centrality()
+        estimates, intervals = analyzer.approximate_closeness(epsilon=0.9, seed=0)
+        self.assertNotEqual(estimates, exact)
+        for v, value in exact.items():
+            self.assertLessEqual(intervals[v][0], value)
+            self.assertGreaterEqual(intervals[v][1], value)
+
+    def test_approximate_small_graphs(self):
+        pair = CentralityAnalyzer(MN_Graph({1: [(2, 1)], 2: []}))
+        self.assertEqual(pair.approximate_betweenness(seed=0), ({1: 0.0, 2: 0.0}, {1: (0.0, 0.0), 2: (0.0, 0.0)}))
+        estimates, intervals = pair.approximate_closeness(seed=0)
+        self.assertEqual(estimates, {1: 1.0, 2: 0.0})
+        self.assertEqual(intervals, {1: (1.0, 1.0), 2: (0.0, 0.0)})
+        empty = CentralityAnalyzer(MN_Graph())
+        self.assertEqual(empty.approximate_betweenness(seed=0), ({}, {}))
+        self.assertEqual(empty.approximate_closeness(seed=0), ({}, {}))
+
+
+if __name__ == "__main__":
+    unittest.main()